@@ -0,0 +1,165 @@
+'''this file contains functions for running a simulation on bit packed boards.
+
+Each row of a board is stored as a single python int where bit j is the cell
+in column j.  Neighbors are counted with bitwise adders so every operation
+advances a whole row of cells at once.
+'''
+
+# map cell values to ascii digits and back, used to pack and unpack rows
+_TO_DIGITS = bytes([48] + [49]*255)
+_FROM_DIGITS = bytes(range(48)) + b'\x00\x01' + bytes(range(50, 256))
+
+
+def pack_board(board):
+    '''Convert a 2d list of 0s and 1s into a list of row ints.
+
+    input:
+        board, 2d list of ints (n x m)
+    output:
+        rows, list of n ints where bit j of rows[i] is board[i][j]
+    '''
+
+    return [int(bytes(row).translate(_TO_DIGITS)[::-1] or b'0', 2)
+            for row in board]
+
+
+def unpack_board(rows, width):
+    '''Convert a list of row ints back into a 2d list of 0s and 1s.
+
+    input:
+        rows, list of ints as made by pack_board
+        width, int the number of cells in each row
+    output:
+        board, 2d list of ints (n x width)
+    '''
+
+    fmt = '0%db' % width
+    return [list(format(row, fmt).encode()[::-1].translate(_FROM_DIGITS))
+            for row in rows]
+
+
+def pad_rows(rows, k_radius, boundary_condition):
+    '''Add k_radius halo rows above and below rows.
+
+    For a torus the halo rows wrap around the board, for a dead boundary
+    they are empty.
+
+    inputs:
+        rows, list of row ints
+        k_radius, int the neighborhood radius
+        boundary_condition, 'torus' or 'dead'
+    output:
+        window, list of len(rows) + 2*k_radius row ints
+    '''
+
+    if boundary_condition == 'torus':
+        return [rows[i % len(rows)]
+                for i in range(-k_radius, len(rows)+k_radius)]
+
+    return [0]*k_radius + list(rows) + [0]*k_radius
+
+
+def shifted_rows(row, width, k_radius, boundary_condition):
+    '''Return the row shifted by every column offset in the neighborhood.
+
+    Bit j of the result for offset dj is the cell in column j+dj.
+
+    inputs:
+        row, int a single packed row
+        width, int the number of cells in the row
+        k_radius, int the neighborhood radius
+        boundary_condition, 'torus' or 'dead'
+    output:
+        planes, list of 2*k_radius+1 ints
+    '''
+
+    mask = (1 << width) - 1
+    planes = []
+    for dj in range(-k_radius, k_radius+1):
+        if boundary_condition == 'torus':
+            s = dj % width
+            planes.append(((row >> s) | (row << (width - s))) & mask)
+        elif dj >= 0:
+            planes.append(row >> dj)
+        else:
+            planes.append((row << -dj) & mask)
+
+    return planes
+
+
+def step_rows(window, width, table, k_radius, boundary_condition):
+    '''Calculate the next state of the rows in the middle of window.
+
+    Every shifted copy of the neighborhood (including the cell itself) is
+    added into a bit sliced counter, so a cell with n neighbors has a total
+    of n if it is dead and n+1 if it is alive.  The born and survive numbers
+    are read out of table.
+
+    inputs:
+        window, list of row ints including k_radius halo rows on each side
+        width, int the number of cells in each row
+        table, 2d list of ints, the rules table made by gol_board
+        k_radius, int the neighborhood radius
+        boundary_condition, 'torus' or 'dead'
+    output:
+        rows, list of len(window) - 2*k_radius row ints
+    '''
+
+    mask = (1 << width) - 1
+    n_bits = ((k_radius*2+1)**2).bit_length()
+    born = [n for n in range(len(table[0])) if table[0][n]]
+    survive = [n + 1 for n in range(len(table[1])) if table[1][n]]
+
+    planes = [shifted_rows(row, width, k_radius, boundary_condition)
+              for row in window]
+
+    rows = []
+    for i in range(k_radius, len(window)-k_radius):
+        counter = [0]*n_bits
+        for src in planes[i-k_radius:i+k_radius+1]:
+            for carry in src:
+                # ripple carry add of a single bit plane
+                for b in range(n_bits):
+                    if not carry:
+                        break
+                    c = counter[b]
+                    counter[b] = c ^ carry
+                    carry = c & carry
+
+        alive = window[i]
+        rows.append((~alive & _match(counter, born, mask)) |
+                    (alive & _match(counter, survive, mask)))
+
+    return rows
+
+
+def step_board(rows, width, table, k_radius, boundary_condition):
+    '''Calculate the next state of a whole packed board.
+
+    inputs:
+        rows, list of row ints
+        width, int the number of cells in each row
+        table, 2d list of ints, the rules table made by gol_board
+        k_radius, int the neighborhood radius
+        boundary_condition, 'torus' or 'dead'
+    output:
+        rows, list of row ints, the next state
+    '''
+
+    window = pad_rows(rows, k_radius, boundary_condition)
+    return step_rows(window, width, table, k_radius, boundary_condition)
+
+
+def _match(counter, totals, mask):
+    '''Return the bits of the cells whose counter equals any of totals.'''
+
+    result = 0
+    for total in totals:
+        m = mask
+        for b in range(len(counter)):
+            m &= counter[b] if (total >> b) & 1 else ~counter[b]
+            if not m:
+                break
+        result |= m
+
+    return result
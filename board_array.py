@@ -0,0 +1,198 @@
+'''this file contains a compact board stored as one byte per cell, and the
+functions for running a simulation on it.
+
+Neighbors are counted on the whole board at once by reading the bytes as one
+large int, so each byte is a lane holding the count of one cell.  Adding
+copies of the int shifted by whole bytes sums the neighborhoods, and since a
+count never reaches 256 no lane carries into the next.  The next state is
+then looked up for every cell with a single bytes.translate.
+
+Only the cells and the padded copy are kept between generations.  Python
+ints are immutable, so each step still makes about 4k+3 temporary ints the
+size of the board, plus the bytes of the keys and their translation; these
+are freed as soon as the step ends.
+'''
+
+
+class board_array:
+
+    '''Class represents a single state of a sim as a bytearray with one byte
+    per cell, row after row.
+
+    Indexing returns a row as a memoryview, so board[y][x] reads and writes
+    cells and a board_array can be used wherever a 2d list of ints is read.
+    A board_array equals a 2d list holding the same values.
+
+    attributes:
+        height, int the number of rows
+        width, int the number of cells in each row
+        cells, bytearray of height * width cells, 0 or 1
+    '''
+
+    __slots__ = ('height', 'width', 'cells')
+
+    def __init__(self, height, width, cells=None):
+        '''create a board, all dead unless cells is given.
+
+        inputs:
+            height, width, ints the size of the board
+            cells, bytes-like of height * width values to copy
+        '''
+
+        self.height = height
+        self.width = width
+        if cells is None:
+            self.cells = bytearray(height * width)
+        else:
+            self.cells = bytearray(cells)
+            if len(self.cells) != height * width:
+                raise ValueError('cells does not match the board size')
+
+    @classmethod
+    def from_list(cls, board):
+        '''Return a new board_array holding the values of a 2d list.'''
+
+        return cls(len(board), len(board[0]),
+                   b''.join(bytes(row) for row in board))
+
+    def tolist(self):
+        '''Return the board as a 2d list of ints.'''
+
+        w = self.width
+        return [list(self.cells[i*w:(i+1)*w]) for i in range(self.height)]
+
+    def copy(self):
+        '''Return a new board_array with a copy of the cells.'''
+        return board_array(self.height, self.width, self.cells)
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, i):
+        '''Return row i as a memoryview into cells.'''
+
+        if i < 0:
+            i += self.height
+        if not 0 <= i < self.height:
+            raise IndexError('board_array index out of range')
+        return memoryview(self.cells)[i*self.width:(i+1)*self.width]
+
+    def __setitem__(self, i, row):
+        '''Overwrite row i with the values of row.'''
+        self[i][:] = bytes(row)
+
+    def __iter__(self):
+        for i in range(self.height):
+            yield self[i]
+
+    def __eq__(self, other):
+        if isinstance(other, board_array):
+            return (self.height, self.width, self.cells) == \
+                (other.height, other.width, other.cells)
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'board_array(%d, %d)' % (self.height, self.width)
+
+
+def rules_table(table):
+    '''Convert a gol_board rules table into a translate table.
+
+    The table is indexed by 2 * total + alive, where total is the number of
+    live cells in the kernel including the cell itself.
+
+    input:
+        table, 2d list of ints, see gol_board.init_rules_table
+    output:
+        rules, bytes of length 256
+    '''
+
+    rules = bytearray(256)
+    for key in range(256):
+        total, alive = divmod(key, 2)
+        n = total - alive
+        if alive <= total and n < len(table[alive]):
+            rules[key] = table[alive][n]
+    return bytes(rules)
+
+
+def pad_cells(board, k, bc, pad):
+    '''Copy board into pad with a border of k cells on every side, wrapped
+    for the 'torus' boundary condition and dead otherwise.
+
+    inputs:
+        board, board_array the current state
+        k, int the width of the border
+        bc, string the boundary condition
+        pad, bytearray of (height + 2k) * (width + 2k) cells, the border of
+             which must be dead for the 'dead' boundary condition
+    '''
+
+    height, width = board.height, board.width
+    stride = width + 2*k
+    cells = memoryview(board.cells)
+    torus = bc == 'torus'
+    for r in range(height + 2*k):
+        i = r - k
+        if torus:
+            i %= height
+        elif not 0 <= i < height:
+            continue
+
+        row = cells[i*width:(i+1)*width]
+        start = r*stride
+        pad[start+k:start+k+width] = row
+        if not torus or k == 0:
+            continue
+        if k <= width:
+            pad[start:start+k] = row[width-k:]
+            pad[start+k+width:start+stride] = row[:k]
+        else:
+            pad[start:start+stride] = bytes(row[(j - k) % width]
+                                            for j in range(stride))
+
+
+def step(board, out, rules, k, bc, pad=None):
+    '''Calculate the next state of board and write it into out.
+
+    inputs:
+        board, board_array the current state
+        out, board_array of the same size which is overwritten
+        rules, bytes as made by rules_table
+        k, int the neighborhood radius
+        bc, string the boundary condition, 'torus' or 'dead'
+        pad, bytearray reused between calls, see pad_cells.  A new one is
+             made if it is None.
+    '''
+
+    if 2*(2*k+1)**2 + 1 > 255:
+        raise ValueError('board_array only supports k_radius up to 5')
+
+    height, width = board.height, board.width
+    stride = width + 2*k
+    if pad is None:
+        pad = bytearray((height + 2*k) * stride)
+    pad_cells(board, k, bc, pad)
+
+    cells = int.from_bytes(pad, 'little')
+
+    # sum each row of the kernel, then the rows, one byte per cell
+    rows = cells
+    for d in range(1, 2*k+1):
+        rows += cells >> 8*d
+    total = rows
+    for d in range(1, 2*k+1):
+        total += rows >> 8*stride*d
+
+    # lane i*stride + j now holds the kernel total of cell (i, j)
+    keys = (2*total + (cells >> 8*(k*stride + k))).to_bytes(len(pad),
+                                                             'little')
+    keys = memoryview(keys.translate(rules))
+
+    dest = memoryview(out.cells)
+    for i in range(height):
+        dest[i*width:(i+1)*width] = keys[i*stride:i*stride+width]
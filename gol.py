@@ -1,12 +1,212 @@
 # -*- coding: utf-8 -*-
 
-import gol_gui
+import argparse
+import contextlib
+import itertools
+import random
+import time
 
-'''main script which launches the app'''
+import gol_board
+import gol_export
+import gol_history
+import image_utility as imgu
+import pattern_io
+
+'''main script which launches the app, or runs a sim without a display when
+given --headless'''
 
 
 def main():
-    gol_gui.gol_gui()
+    args = parse_args()
+    if args.headless:
+        run_headless(args)
+    else:
+        import gol_gui
+        gol_gui.gol_gui()
+
+
+def parse_args(argv=None):
+    '''Parse command line arguments.  The random board options match the
+    fields of the File -> New dialog and the rule options match the
+    View -> Settings dialog.'''
+
+    parser = argparse.ArgumentParser(description="Conway's game of life")
+    parser.add_argument('--headless', action='store_true',
+                        help='run without the GUI and print statistics')
+    parser.add_argument('--map', help='GIF or pattern (.rle, .lif, .mc) '
+                                      'file used as the start board')
+    parser.add_argument('--width', type=int, default=32,
+                        help='width of a random start board')
+    parser.add_argument('--height', type=int, default=32,
+                        help='height of a random start board')
+    parser.add_argument('--prob', type=float, default=0.5,
+                        help='probability a cell of a random board is alive')
+    parser.add_argument('--seed', type=int,
+                        default=int(random.random()*10**6),
+                        help='seed for the random start board')
+    parser.add_argument('--generations', type=int, default=64,
+                        help='number of time steps to calculate')
+    parser.add_argument('--born', type=number_list,
+                        help='born numbers separated by commas, default 3 '
+                             'or the rule of a pattern --map')
+    parser.add_argument('--survive', type=number_list,
+                        help='survive numbers separated by commas, default '
+                             '2,3 or the rule of a pattern --map')
+    parser.add_argument('--bc', default='torus',
+                        choices=['torus', 'dead', 'infinite'],
+                        help='boundary condition')
+    parser.add_argument('--radius', type=int, default=1,
+                        help='neighborhood radius')
+    parser.add_argument('--engine', default='list',
+                        choices=['list', 'numpy', 'bitpack', 'array',
+                                 'compiled'],
+                        help='engine used to calculate states')
+    parser.add_argument('--history',
+                        help='file every state is written to, see '
+                             'gol_history.history_writer')
+    parser.add_argument('--export',
+                        help='animated .gif, or numbered .pgm images such as '
+                             'gen_%%05d.pgm, every generation is drawn to.  '
+                             'With --bc infinite the frame is the window '
+                             'holding every generation, found by running '
+                             'the sim once beforehand')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='pixels per cell of exported images')
+    parser.add_argument('--delay', type=int, default=10,
+                        help='hundredths of a second per exported GIF frame')
+    return parser.parse_args(argv)
+
+
+def number_list(s):
+    '''Convert a string of integers separated by commas into a list of ints
+    for argparse.'''
+
+    try:
+        return [int(i) for i in s.replace(' ', '').split(',') if i]
+    except ValueError:
+        raise argparse.ArgumentTypeError('%r is not a list of integers' % s)
+
+
+def run_headless(args):
+    '''Run a sim described by args and print throughput and statistics of
+    the final state.
+
+    The run stops early if a state repeats, in which case stable and period
+    give the first generation of the cycle and its length.  When exporting
+    images every generation is calculated instead, so each gets a frame.
+    calculated is the number of generations actually stepped, which
+    generations/sec and cells/sec are both measured over.
+
+    input:
+        args, Namespace returned by parse_args
+    output:
+        stats, dict of the printed values
+    '''
+
+    rules = {'born_numbers': [3], 'survive_numbers': [2, 3]}
+    if args.map and pattern_io.is_pattern(args.map):
+        board, pattern_rules = pattern_io.load_board(args.map)
+        rules.update(pattern_rules)
+    elif args.map:
+        board = imgu.load_gif(args.map)
+    else:
+        board = imgu.create_random_board(args.width, args.height,
+                                         args.prob, args.seed)
+
+    if args.born is not None:
+        rules['born_numbers'] = args.born
+    if args.survive is not None:
+        rules['survive_numbers'] = args.survive
+
+    gol = gol_board.gol_board(board, args.generations, run=False)
+    gol.born_numbers = rules['born_numbers']
+    gol.survive_numbers = rules['survive_numbers']
+    gol.boundary_condition = args.bc
+    gol.k_radius = args.radius
+    gol.engine = args.engine
+    gol.detect_cycles = True
+
+    # the writers are closed when the run ends, or removed if it fails
+    with contextlib.ExitStack() as stack:
+        writer = None
+        if args.history:
+            writer = stack.enter_context(
+                gol_history.history_writer(args.history, gol))
+
+        exporter = None
+        if args.export:
+            gol.detect_cycles = False
+            bounds = (0, 0, len(board), len(board[0]))
+            if args.bc == 'infinite':
+                # every generation is drawn in the window which holds all
+                # of them, so nothing leaves the frame
+                bounds = gol_export.run_bounds(gol)
+            height, width = bounds[2:]
+            if args.export.lower().endswith('.gif'):
+                image_writer = gol_export.gif_writer(args.export, width,
+                                                     height, args.scale,
+                                                     args.delay)
+            else:
+                image_writer = gol_export.pgm_writer(args.export, args.scale)
+            exporter = stack.enter_context(gol_export.exporter(image_writer))
+
+        def size(state):
+            # cells updated by a generation, only live cells matter on
+            # infinite boards
+            return len(state) if args.bc == 'infinite' else \
+                len(state) * len(state[0])
+
+        # the size of every state, the start state is not calculated
+        sizes = []
+        start = time.perf_counter()
+        for t, state in enumerate(gol.iter_states()):
+            if writer is not None:
+                writer.append(state)
+            if exporter is not None:
+                exporter.put(gol_board.cells2board(state, *bounds)
+                             if args.bc == 'infinite' else state)
+            final = state
+            sizes.append(size(state))
+        calculated = t
+        cells = sum(sizes[1:])
+
+        if gol.period is not None:
+            # the repeated state which stopped the run was calculated too,
+            # and the final state is less than a period further on
+            calculated += 1
+            cells += sizes[gol.cycle_start]
+            steps = (args.generations - t) % gol.period
+            for final in itertools.islice(gol.iter_engine(final), steps):
+                calculated += 1
+                cells += size(final)
+        elapsed = time.perf_counter() - start
+
+    if args.bc != 'infinite':
+        final = gol_board.board2cells(final)
+
+    stats = {
+        'generations': args.generations,
+        'calculated': calculated,
+        'seconds': elapsed,
+        'generations/sec': calculated / elapsed if elapsed else 0,
+        'cells/sec': cells / elapsed if elapsed else 0,
+        'population': len(final),
+        'density': len(final) / (len(board) * len(board[0])),
+        'stable': gol.cycle_start,
+        'period': gol.period,
+        }
+    if final:
+        stats['bounding box'] = (min(y for y, x in final),
+                                 min(x for y, x in final),
+                                 max(y for y, x in final),
+                                 max(x for y, x in final))
+
+    for key, value in stats.items():
+        if isinstance(value, float):
+            value = '%.4g' % value
+        print('%-16s %s' % (key + ':', value))
+
+    return stats
 
 
 if __name__ == "__main__":
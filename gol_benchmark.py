@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+'''script which times the main functions of the sim across board sizes,
+densities, neighborhood radii, boundary conditions and engines.
+
+Results are written as JSON and can be compared against a stored baseline, in
+which case any case which got slower by more than the threshold is reported
+as a regression and the script exits with status 1.
+
+    python gol_benchmark.py --save-baseline
+    python gol_benchmark.py --baseline benchmark_baseline.json
+'''
+
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import time
+import tkinter as tk
+
+import gol_board
+import image_utility as imgu
+
+# parameters of each suite, --full takes much longer
+QUICK = {'sizes': [64], 'densities': [0.2, 0.5], 'radii': [1, 3, 5],
+         'generations': 8}
+FULL = {'sizes': [64, 256, 1024], 'densities': [0.1, 0.3, 0.5],
+        'radii': [1, 2, 3, 4, 5], 'generations': 32}
+
+
+def time_call(func, *args, repeat=3):
+    '''Return the fastest of repeat calls to func(*args) in seconds.'''
+
+    best = float('inf')
+    for i in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def make_gol(board, bc='torus', radius=1, engine='list', generations=0):
+    '''Return a gol_board with the given settings which has not been run.'''
+
+    gol = gol_board.gol_board(board, generations, run=False)
+    gol.boundary_condition = bc
+    gol.k_radius = radius
+    gol.engine = engine
+    gol.detect_cycles = False
+    gol.init_rules_table()
+    return gol
+
+
+def run_suite(params, repeat=3):
+    '''Time every case described by params.
+
+    input:
+        params, dict like QUICK or FULL
+    output:
+        results, dict mapping case name to seconds
+    '''
+
+    results = {}
+
+    def record(name, func, *args):
+        results[name] = time_call(func, *args, repeat=repeat)
+        print('%-60s %10.6f' % (name, results[name]))
+
+    engines = ['list', 'bitpack', 'array', 'compiled'] + (
+        ['numpy'] if gol_board.np else [])
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        root = None
+
+    for size in params['sizes']:
+        for density in params['densities']:
+            board = imgu.create_random_board(size, size, density, 0)
+            case = 'size=%d density=%g' % (size, density)
+
+            record('create_random_board %s' % case,
+                   imgu.create_random_board, size, size, density, 0)
+
+            for bc in ['torus', 'dead']:
+                for radius in params['radii']:
+                    gol = make_gol(board, bc, radius)
+                    name = '%s %s radius=%d' % ('map_neighbors_' + bc, case,
+                                                radius)
+                    record(name, gol.map_neighbors, board)
+
+            gol = make_gol(board)
+            n_map = gol.map_neighbors(board)
+            record('step_board %s' % case, gol.step_board, board, n_map)
+
+            for engine in engines:
+                for bc in ['torus', 'dead']:
+                    for radius in params['radii']:
+                        gol = make_gol(board, bc, radius, engine,
+                                       params['generations'])
+                        record('run %s bc=%s radius=%d engine=%s '
+                               'generations=%d' % (case, bc, radius, engine,
+                                                   params['generations']),
+                               gol.run)
+
+            record('board2pgm %s' % case, imgu.board2pgm, board)
+            if root is not None:
+                record('board2img %s' % case, imgu.board2img, board)
+
+    for path in sorted(glob.glob('./maps/*.gif')):
+        name = os.path.basename(path)
+        record('load_gif %s' % name, imgu.load_gif, path)
+        if root is not None:
+            img = tk.PhotoImage(file=path)
+            record('img2board %s' % name, imgu.img2board, img)
+
+    if root is not None:
+        root.destroy()
+
+    return results
+
+
+def compare(results, baseline, threshold=0.25):
+    '''Return the cases which are slower than baseline by more than
+    threshold.
+
+    inputs:
+        results, dict mapping case name to seconds
+        baseline, dict mapping case name to seconds
+        threshold, float the allowed fractional slow down
+    output:
+        regressions, list of (name, baseline seconds, seconds) tuples
+    '''
+
+    return [(name, baseline[name], seconds)
+            for name, seconds in sorted(results.items())
+            if name in baseline and seconds > baseline[name]*(1 + threshold)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='time the gol functions')
+    parser.add_argument('--full', action='store_true',
+                        help='use larger boards and every radius')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='times each case is run, the fastest is kept')
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help='file the results are written to')
+    parser.add_argument('--baseline',
+                        help='results file to compare against')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='also write the results to '
+                             'benchmark_baseline.json')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='fractional slow down reported as a regression')
+    args = parser.parse_args(argv)
+
+    results = run_suite(FULL if args.full else QUICK, args.repeat)
+    data = {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'results': results}
+
+    outputs = [args.output]
+    if args.save_baseline:
+        outputs.append('benchmark_baseline.json')
+    for output in outputs:
+        with open(output, 'w') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new in regressions:
+            print('REGRESSION %s: %.6f -> %.6f (%.0f%% slower)' %
+                  (name, old, new, (new/old - 1)*100))
+        if regressions:
+            return 1
+        print('no regressions against %s' % args.baseline)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
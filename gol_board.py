@@ -1,5 +1,130 @@
 # -*- coding: utf-8 -*-
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import collections
+import hashlib
+import itertools
+import operator
+
+import bit_board
+import board_array
+import gol_history
+import gol_kernel
+import gol_timing
+
+
+def board2cells(board):
+    '''Return the set of (y, x) positions of the live cells in a 2d list.'''
+
+    return set((y, x) for y in range(len(board))
+               for x in range(len(board[y])) if board[y][x])
+
+
+def cells2board(cells, y0, x0, height, width):
+    '''Return a window of a set of live cells as a 2d list.
+
+    inputs:
+        cells, set of (y, x) positions of live cells
+        y0, x0, ints the position of the top left cell of the window
+        height, width, ints the size of the window
+    output:
+        board, 2d list of ints (height x width)
+    '''
+
+    board = [[0]*width for i in range(height)]
+    for y, x in cells:
+        if 0 <= y - y0 < height and 0 <= x - x0 < width:
+            board[y - y0][x - x0] = 1
+
+    return board
+
+
+def window_sums(row, k, wrap):
+    '''Return the sums of row over the 2k+1 long windows centred on each
+    entry.
+
+    inputs:
+        row, list of ints or of lists of ints, lists are added element-wise.
+             Other sequences, such as the memoryview rows of a board_array,
+             are read as lists.
+        k, int the radius of each window
+        wrap, bool if True row wraps around, otherwise it is padded with
+              zeros
+    output:
+        sums, list the same length as row
+    '''
+
+    if not isinstance(row, list):
+        row = list(row)
+    n = len(row)
+    zero = 0 if n == 0 or not isinstance(row[0], list) else [0]*len(row[0])
+    if not wrap:
+        ext = [zero]*k + list(row) + [zero]*k
+    elif k < n:
+        ext = row[n-k:] + row + row[:k]
+    else:
+        ext = [row[j % n] for j in range(-k, n+k)]
+
+    if zero == 0:
+        p = [0]
+        p += itertools.accumulate(ext)
+        return list(map(operator.sub, p[2*k+1:], p[:n]))
+
+    p = [zero]
+    p += itertools.accumulate(ext, lambda a, b: list(map(operator.add, a, b)))
+    return [list(map(operator.sub, a, b)) for a, b in zip(p[2*k+1:], p[:n])]
+
+
+def box_sums(board, k, wrap):
+    '''Return the number of live cells within k cells of each cell,
+    excluding the cell itself.
+
+    The sum over each (2k+1 x 2k+1) box is a window sum along the rows
+    followed by one down the columns, so each cell costs the same for any k.
+
+    inputs:
+        board, 2d list of ints, 0 or 1, or a board_array
+        k, int the neighborhood radius
+        wrap, bool True for a toroidal board, False for dead boundaries
+    output:
+        n_map, 2d list of ints the same size as board
+    '''
+
+    rows = [window_sums(row, k, wrap) for row in board]
+    return [list(map(operator.sub, total, row))
+            for total, row in zip(window_sums(rows, k, wrap), board)]
+
+
+def open_history(path):
+    '''Return a gol_board holding the sim saved in a history file.
+
+    The rules are read from the header and states is a memory mapped
+    gol_history.history_file, so states are only read from disk when they are
+    used.
+
+    input:
+        path, string a file written by gol_board.write_history or
+              gol_history.history_writer
+    output:
+        gol, gol_board which has been run
+    '''
+
+    states = gol_history.history_file(path)
+    if len(states) == 0:
+        raise ValueError('%s holds no states' % path)
+
+    gol = gol_board(states[0], states.generations, run=False)
+    for key in ['born_numbers', 'survive_numbers', 'k_radius',
+                'boundary_condition', 'cycle_start', 'period']:
+        setattr(gol, key, getattr(states, key))
+    gol.states = states
+    gol.init_rules_table()
+    return gol
+
 
 class gol_board:
 
@@ -13,45 +138,431 @@ class gol_board:
         survive_numbers, list of ints where neighbor values maintain a 1 as a 1
         k_radius, int neighbors are found in a square kernel with side
                   k_radius * 2 + 1.
-        boundary_condition, string used to select which bc to use in the sim
+        boundary_condition, string used to select which bc to use in the sim.
+                            'torus' and 'dead' keep the size of start,
+                            'infinite' lets the board grow without limit.
+        engine, string used to select how states are computed. 'list' uses
+                plain 2d lists, 'numpy' uses vectorized arrays (requires
+                numpy), 'bitpack' stores each row as a single int, 'array'
+                uses board_array and 'compiled' runs a step function
+                generated for the rules, see gol_kernel.  All give
+                identical states.
         size, list of ints [height, width] of the current sim
         generations, int number of time frames in the simulation
+        start, 2d list of ints, the starting state of the sim
         states, 3d list of ints representing the state in eachtime point
-                states[time][y_position][x_position]
+                states[time][y_position][x_position].  With the 'infinite'
+                boundary condition each state is instead a set of (y, x)
+                positions of live cells, see dense_states.
         table, 2d list of ints represents the truth table for determining the
                next state of a cell. table[is_cell_alive][num_neighbors]
+        history_size, int or None, if set iter_states keeps the most recent
+                      history_size states in recent
+        recent, deque of the most recent states yielded by iter_states
+        detect_cycles, bool if True the sim stops as soon as a state repeats,
+                       off by default so states has generations + 1
+                       states
+        cycle_start, int the first generation of the repeating cycle, or None
+        period, int the number of generations in the cycle, or None
     '''
 
     born_numbers = [3]
     survive_numbers = [2, 3]
     k_radius = 1
     boundary_condition = 'torus'
+    engine = 'list'
+    history_size = None
+    detect_cycles = False
 
-    def __init__(self, start, gen):
+    def __init__(self, start, gen, run=True):
         '''create a new simularion from a starting state running for some
         number of time steps.
 
         inputs:
             start, 2d list of ints, the starting state of the sim
             gen, int, the number of generations over which the sim is run
+            run, bool, if False the sim is not run until run or iter_states
+                 is called
         '''
         self.table = []
         self.generations = gen
+        self.start = start
         self.states = [start]
-        self.run()
+        self.recent = collections.deque(maxlen=self.history_size)
+        self.cycle_start = None
+        self.period = None
+        if run:
+            self.run()
 
     def run(self):
         '''advance the simulation for each time step and append the result to
         states
+
+        If a state repeats, states stops at the generation before the repeat
+        and later generations are found with get_state.
+        '''
+
+        self.states = []
+        for board in self.iter_states():
+            self.states.append(board)
+
+    def iter_states(self):
+        '''Yield every state of the simulation, starting with the start state,
+        as soon as it is calculated.
+
+        Nothing is added to states, so memory use does not grow with the
+        number of generations.  If history_size is set the last history_size
+        states are also kept in recent.
+
+        If detect_cycles is True a digest of each state is kept, and once a
+        state repeats cycle_start and period are set and no more states are
+        yielded since every later state is already known.  See state_index.
         '''
 
         self.init_rules_table()
-        self.states = [self.states[0]]
-        for i in range(self.generations):
-            # print(i)
-            board = self.states[-1]
+        self.recent = collections.deque(maxlen=self.history_size)
+        keep = self.recent.append if self.history_size else None
+        self.cycle_start = None
+        self.period = None
+        seen = {}
+
+        board = self.start_state()
+        states = itertools.chain([board], self.iter_engine(board))
+        for t, board in enumerate(itertools.islice(states,
+                                                   self.generations + 1)):
+            if self.detect_cycles:
+                key = self.state_digest(board)
+                if key in seen:
+                    self.cycle_start = seen[key]
+                    self.period = t - seen[key]
+                    return
+                seen[key] = t
+
+            if keep is not None:
+                keep(board)
+            yield board
+
+    def write_history(self, path):
+        '''Run the sim and write every state to a history file as soon as
+        it is calculated, see gol_history.history_writer.
+
+        Like iter_states nothing is added to states, so runs of any length
+        can be saved.  Open the file again with open_history.
+
+        input:
+            path, string the file to write
+        output:
+            frames, int the number of states written
+        '''
+
+        with gol_history.history_writer(path, self) as writer:
+            for board in self.iter_states():
+                writer.append(board)
+        return writer.frames
+
+    def iter_engine(self, board):
+        '''Return an endless generator of the states after board using the
+        engine selected by engine.'''
+
+        switcher = {
+            'list': self.iter_list,
+            'numpy': self.iter_numpy,
+            'bitpack': self.iter_bitpack,
+            'array': self.iter_array,
+            'compiled': self.iter_compiled
+            }
+
+        return switcher[self.engine](board)
+
+    def advance(self, board, generations):
+        '''Return the state generations time steps after board, which must be
+        in the form used by the current boundary condition.  states is not
+        changed.'''
+
+        self.init_rules_table()
+        for board in itertools.islice(self.iter_engine(board), generations):
+            pass
+        return board
+
+    @gol_timing.timed('state_digest')
+    def state_digest(self, board):
+        '''Return a digest identifying a state, used to find repeats.'''
+
+        if self.boundary_condition == 'infinite':
+            data = repr(sorted(board)).encode()
+        elif isinstance(board, board_array.board_array):
+            data = bytes(board.cells)
+        else:
+            data = b''.join(bytes(row) for row in board)
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def state_index(self, t):
+        '''Return the index in states of the state at generation t.
+
+        Once a cycle has been found, generations past the end of states are
+        mapped back into the cycle.
+        '''
+
+        if self.period is None or t < self.cycle_start + self.period:
+            return t
+        return self.cycle_start + (t - self.cycle_start) % self.period
+
+    def get_state(self, t):
+        '''Return the state at generation t of a sim which has been run.'''
+        return self.states[self.state_index(t)]
+
+    def toggle_cells(self, cells):
+        '''Toggle cells of the start board and update states without running
+        the whole sim again.
+
+        A change can only spread k_radius cells per generation, so each
+        generation only recalculates the cells within k_radius of a cell
+        which changed in the generation before.  Everything else is reused
+        from the old states, and once no cell changes the rest of the states
+        are kept as they are.  The sim must have been run with run().  On
+        an infinite board the sim is simply run again.
+
+        If a cycle had been found, cycle_start is moved to the generation
+        where the edit stops having any effect, so it may no longer be the
+        first generation of the cycle.
+
+        If states is a gol_history or history_file, which can not be changed
+        in place, the states are updated as a list and then stored in a new
+        gol_history.  A history_file is closed once it has been read.
+
+        input:
+            cells, iterable of (y, x) positions in the start board
+        '''
+
+        if isinstance(self.start, board_array.board_array):
+            self.start = self.start.copy()
+        else:
+            self.start = [row[:] for row in self.start]
+        for y, x in cells:
+            self.start[y][x] = 1 - self.start[y][x]
+
+        store = self.states
+        if not isinstance(store, list):
+            self.states = list(store)
+
+        if self.boundary_condition == 'infinite':
+            self.run()
+        else:
+            self.update_states(cells)
+
+        if isinstance(store, list):
+            return
+        history = gol_history.gol_history(getattr(store, 'interval', 32))
+        for board in self.states:
+            history.append(board)
+        self.states = history
+        if isinstance(store, gol_history.history_file):
+            store.close()
+
+    def update_states(self, cells):
+        '''Recalculate the cells of states which may change after cells of
+        the start board were toggled, see toggle_cells.  states must be a
+        list.
+
+        input:
+            cells, iterable of (y, x) positions which changed in the start
+                   board
+        '''
+
+        self.init_rules_table()
+        height, width = len(self.start), len(self.start[0])
+        k = self.k_radius
+        offsets = [(di, dj) for di in range(-k, k+1) for dj in range(-k, k+1)]
+        torus = self.boundary_condition == 'torus'
+
+        cycle = None
+        if self.period is not None:
+            # old states past the end of states come from the old cycle
+            cycle = (self.cycle_start,
+                     self.states[self.cycle_start:
+                                 self.cycle_start + self.period])
+
+        dirty = set((y, x) for y, x in cells)
+        board = self.start
+        self.states[0] = board
+        # first generation which is the same as before the edit
+        same = None
+        for t in range(1, self.generations + 1):
+            if not dirty:
+                same = t - 1
+                break
+
+            if t < len(self.states):
+                old = self.states[t]
+            else:
+                old = cycle[1][(t - cycle[0]) % len(cycle[1])]
+
+            # cells which may change are within k_radius of a changed cell
+            near = set()
+            for y, x in dirty:
+                for di, dj in offsets:
+                    if torus:
+                        near.add(((y+di) % height, (x+dj) % width))
+                    elif 0 <= y+di < height and 0 <= x+dj < width:
+                        near.add((y+di, x+dj))
+
+            if isinstance(old, board_array.board_array):
+                new = old.copy()
+            else:
+                new = list(old)
+            copied = set()
+            dirty = set()
+            for y, x in near:
+                n = -board[y][x]
+                for di, dj in offsets:
+                    if torus:
+                        n += board[(y+di) % height][(x+dj) % width]
+                    elif 0 <= y+di < height and 0 <= x+dj < width:
+                        n += board[y+di][x+dj]
+
+                value = self.table[board[y][x]][n]
+                if value != old[y][x]:
+                    if y not in copied:
+                        new[y] = new[y][:]
+                        copied.add(y)
+                    new[y][x] = value
+                    dirty.add((y, x))
+
+            if t < len(self.states):
+                self.states[t] = new
+            else:
+                self.states.append(new)
+            board = new
+
+        if cycle is None or (same is not None and same <= cycle[0]):
+            # the states of the cycle were not changed
+            return
+
+        if same is None:
+            # every generation was recalculated and stored
+            self.cycle_start = None
+            self.period = None
+            return
+
+        # from generation same on the states are the old ones, which repeat
+        self.cycle_start = same
+        for i in range(len(self.states), same + self.period):
+            self.states.append(cycle[1][(i - cycle[0]) % self.period])
+
+    def start_state(self):
+        '''Return start in the form used by the current boundary condition.'''
+
+        if self.boundary_condition == 'infinite':
+            return board2cells(self.start)
+        return self.start
+
+    def iter_list(self, board):
+        '''yield the states after board, without end, using the 2d list
+        functions, or sets of live cells for the 'infinite' boundary
+        condition'''
+
+        if self.boundary_condition == 'infinite':
+            step = self.step_cells
+        else:
+            step = self.step_board
+            if isinstance(board, board_array.board_array):
+                board = board.tolist()
+
+        while True:
             n_map = self.map_neighbors(board)
-            self.states.append(self.step_board(board, n_map))
+            board = step(board, n_map)
+            yield board
+
+    def iter_numpy(self, board):
+        '''yield the states after board, without end, using numpy arrays.
+
+        The board is kept as an array between time steps and only converted
+        back to a 2d list when it is yielded, so states are the same as those
+        made by iter_list.
+        '''
+
+        if np is None:
+            raise ImportError("engine 'numpy' requires the numpy module")
+        if self.boundary_condition == 'infinite':
+            raise ValueError("engine 'numpy' does not support the 'infinite' "
+                             "boundary condition")
+
+        table = np.array(self.table, dtype=np.uint8)
+        board = np.array(board, dtype=np.uint8)
+        while True:
+            n_map = self.map_neighbors_numpy(board)
+            with gol_timing.phase('rule_lookup'):
+                board = table[board, n_map]
+            with gol_timing.phase('unpack'):
+                state = board.tolist()
+            yield state
+
+    def iter_bitpack(self, board):
+        '''yield the states after board, without end, using bit packed rows.
+
+        See bit_board for details.  The rows are unpacked to a 2d list when
+        they are yielded, so states kept by run are not packed; store them in
+        a gol_history to keep them packed.
+        '''
+
+        if self.boundary_condition == 'infinite':
+            raise ValueError("engine 'bitpack' does not support the "
+                             "'infinite' boundary condition")
+
+        width = len(board[0])
+        rows = bit_board.pack_board(board)
+        while True:
+            with gol_timing.phase('bitpack_step'):
+                rows = bit_board.step_board(rows, width, self.table,
+                                            self.k_radius,
+                                            self.boundary_condition)
+            with gol_timing.phase('unpack'):
+                state = bit_board.unpack_board(rows, width)
+            yield state
+
+    def iter_array(self, board):
+        '''yield the states after board, without end, using board_array.
+
+        The sim is stepped between two board_arrays which are reused every
+        generation, and a copy of the new state is yielded so the states do
+        not change as the sim runs.  See board_array for details.
+        '''
+
+        if self.boundary_condition == 'infinite':
+            raise ValueError("engine 'array' does not support the "
+                             "'infinite' boundary condition")
+
+        if isinstance(board, board_array.board_array):
+            board = board.copy()
+        else:
+            board = board_array.board_array.from_list(board)
+        out = board_array.board_array(board.height, board.width)
+        k = self.k_radius
+        pad = bytearray((board.height + 2*k) * (board.width + 2*k))
+        rules = board_array.rules_table(self.table)
+        while True:
+            with gol_timing.phase('array_step'):
+                board_array.step(board, out, rules, k,
+                                 self.boundary_condition, pad)
+            board, out = out, board
+            yield board.copy()
+
+    def iter_compiled(self, board):
+        '''yield the states after board, without end, using a step function
+        compiled for the current rules, radius and boundary condition.
+
+        See gol_kernel for details.  The step functions are cached, so only
+        the first run with a set of rules pays for compiling it.
+        '''
+
+        step = gol_kernel.get_step(self.born_numbers, self.survive_numbers,
+                                   self.k_radius, self.boundary_condition)
+        if isinstance(board, board_array.board_array):
+            board = board.tolist()
+        while True:
+            with gol_timing.phase('compiled_step'):
+                board = step(board)
+            yield board
 
     def init_rules_table(self):
         '''Create a truth table describing the behavior of the simulation based
@@ -86,17 +597,22 @@ class gol_board:
 
         switcher = {
             'torus': self.map_neighbors_torus,
-            'dead': self.map_neighbors_dead
+            'dead': self.map_neighbors_dead,
+            'infinite': self.map_neighbors_infinite
             }
 
         return switcher[self.boundary_condition](board)
 
+    @gol_timing.timed('map_neighbors')
     def map_neighbors_torus(self, board):
         '''Calculate and return a 2d list counting the number of neighbors in
         each cell using a toroidal boundary condition.
 
         If board is dimension (n x m) then board[n, k] = board[0, k] etc
 
+        The counts are box sums, made with running sums along the rows and
+        then down the columns, so the cost does not depend on k_radius.
+
         input:
             board, 2d list of ints (n x m), a single sim state
         output:
@@ -104,55 +620,118 @@ class gol_board:
                    neighbors at the corresponding location in board
         '''
 
-        n_map = [[0]*len(board[0]) for i in range(len(board))]
-
-        for i in range(len(board)):
-            for j in range(len(board[0])):
-                if board[i][j] == 0:
-                    continue
-
-                n_map[i][j] -= 1
-                for di in range(-self.k_radius, self.k_radius+1):
-                    i2 = (i+di) % len(board)
-                    for dj in range(-self.k_radius, self.k_radius + 1):
-                        j2 = (j+dj) % len(board[0])
-                        n_map[i2][j2] += 1
-
-        return n_map
+        return box_sums(board, self.k_radius, True)
 
+    @gol_timing.timed('map_neighbors')
     def map_neighbors_dead(self, board):
         '''Calculate and return a 2d list counting the number of neighbors in
         each cell using a dead boundary condition.
 
         If board is dimension (n x m) then board[n, k] = 0 etc
 
+        See map_neighbors_torus, the board is padded with dead cells instead
+        of wrapping.
+
         input:
             board, 2d list of ints (n x m), a single sim state
         output:
             n_map, 2d list of int (n x m), where each cell is the number of
                    neighbors at the corresponding location in board
         '''
-        n_map = [[0]*len(board[0]) for i in range(len(board))]
 
-        for i in range(len(board)):
-            for j in range(len(board[0])):
-                if board[i][j] == 0:
-                    continue
+        return box_sums(board, self.k_radius, False)
+
+    @gol_timing.timed('map_neighbors')
+    def map_neighbors_infinite(self, cells):
+        '''Calculate and return a dict counting the number of neighbors around
+        each live cell on an infinite board.
 
-                n_map[i][j] -= 1
-                for di in range(-self.k_radius, self.k_radius+1):
-                    i2 = i + di
-                    if (i+di) % len(board) - i != di:
-                        continue
-                    for dj in range(-self.k_radius, self.k_radius+1):
-                        j2 = j + dj
-                        if (j+dj) % len(board[0]) - j != dj:
-                            continue
+        Only cells within k_radius of a live cell are counted, so the cost
+        depends on the number of live cells and not the size of the board.
 
-                        n_map[i2][j2] += 1
+        input:
+            cells, set of (y, x) positions of live cells
+        output:
+            n_map, dict mapping (y, x) to the number of neighbors, missing
+                   positions have no neighbors
+        '''
+
+        offsets = [(di, dj) for di in range(-self.k_radius, self.k_radius+1)
+                   for dj in range(-self.k_radius, self.k_radius+1)
+                   if di != 0 or dj != 0]
+
+        n_map = {}
+        get = n_map.get
+        for y, x in cells:
+            for di, dj in offsets:
+                pos = (y+di, x+dj)
+                n_map[pos] = get(pos, 0) + 1
 
         return n_map
 
+    @gol_timing.timed('rule_lookup')
+    def step_cells(self, cells, n_map):
+        '''Calculate and return the next step in the simulation on an infinite
+        board.
+
+        inputs:
+            cells, set of (y, x) positions of live cells
+            n_map, dict of neighbor counts made by map_neighbors_infinite
+        output:
+            cells2, set of (y, x) positions of live cells in the next time
+                    state of the simulation
+        '''
+
+        if self.table[0][0]:
+            raise ValueError("born number 0 can not be used with the "
+                             "'infinite' boundary condition")
+
+        born = self.table[0]
+        survive = self.table[1]
+        cells2 = set(pos for pos, n in n_map.items()
+                     if (survive if pos in cells else born)[n])
+
+        if survive[0]:
+            cells2.update(pos for pos in cells if pos not in n_map)
+
+        return cells2
+
+    def dense_states(self):
+        '''Return states as a list of 2d lists.
+
+        For the 'infinite' boundary condition every state is drawn into the
+        smallest window holding the start board and all live cells of every
+        generation.  Otherwise states is returned unchanged.
+
+        output:
+            boards, list of 2d lists of ints, all the same size
+        '''
+
+        if self.boundary_condition != 'infinite':
+            return self.states
+
+        bounds = self.dense_bounds()
+        return [cells2board(cells, *bounds) for cells in self.states]
+
+    def dense_bounds(self):
+        '''Return the smallest window holding the start board and all live
+        cells of every state on an infinite board.
+
+        output:
+            bounds, tuple of ints (y0, x0, height, width) as used by
+                    cells2board
+        '''
+
+        y0, x0 = 0, 0
+        y1, x1 = len(self.start), len(self.start[0])
+        for cells in self.states:
+            for y, x in cells:
+                y0, y1 = min(y0, y), max(y1, y+1)
+                x0, x1 = min(x0, x), max(x1, x+1)
+
+        return (y0, x0, y1-y0, x1-x0)
+
+    @gol_timing.timed('rule_lookup')
     def step_board(self, board, n_map):
         '''Calculate and return the next step in the simulation.
 
@@ -179,3 +758,80 @@ class gol_board:
                 board2[i][j] = self.table[board[i][j]][n_map[i][j]]
 
         return board2
+
+    @gol_timing.timed('map_neighbors')
+    def map_neighbors_numpy(self, board):
+        '''Calculate and return an array counting the number of neighbors in
+        each cell using box sums of the board.
+
+        Gives the same result as map_neighbors_torus or map_neighbors_dead
+        depending on boundary_condition.  The board is padded by k_radius
+        cells, wrapped or dead, and each box sum is the difference of two
+        cumulative sums along each axis, so the cost does not depend on
+        k_radius.  For k_radius 1 adding shifted copies is quicker, see
+        map_neighbors_shifted.
+
+        input:
+            board, 2d array or list of ints (n x m), a single sim state
+        output:
+            n_map, 2d array of ints (n x m), where each cell is the number of
+                   neighbors at the corresponding location in board
+        '''
+
+        board = np.asarray(board, dtype=np.int32)
+        k = self.k_radius
+        if k == 1:
+            return self.map_neighbors_shifted(board)
+
+        mode = 'wrap' if self.boundary_condition == 'torus' else 'constant'
+        height, width = board.shape
+        padded = np.pad(board, k, mode=mode)
+
+        # window i of the padded rows ends at row i+2k and starts at row i
+        sums = padded.cumsum(axis=0)
+        rows = sums[2*k:2*k+height]
+        rows[1:] -= sums[:height-1]
+
+        sums = rows.cumsum(axis=1)
+        n_map = sums[:, 2*k:2*k+width]
+        n_map[:, 1:] -= sums[:, :width-1]
+
+        return n_map - board
+
+    def map_neighbors_shifted(self, board):
+        '''Calculate and return an array counting the number of neighbors in
+        each cell by adding shifted copies of the board.
+
+        This takes (2k+1)^2 additions, which is quicker than the box sums of
+        map_neighbors_numpy for k_radius 1.
+
+        input:
+            board, 2d array of int32 (n x m), a single sim state
+        output:
+            n_map, 2d array of ints (n x m), where each cell is the number of
+                   neighbors at the corresponding location in board
+        '''
+
+        n_map = -board
+
+        if self.boundary_condition == 'torus':
+            for di in range(-self.k_radius, self.k_radius+1):
+                rows = np.roll(board, di, axis=0)
+                for dj in range(-self.k_radius, self.k_radius+1):
+                    n_map += np.roll(rows, dj, axis=1)
+            return n_map
+
+        height, width = board.shape
+        for di in range(-self.k_radius, self.k_radius+1):
+            if abs(di) >= height:
+                continue
+            for dj in range(-self.k_radius, self.k_radius+1):
+                if abs(dj) >= width:
+                    continue
+                # cell (i, j) receives board[i-di][j-dj]
+                n_map[max(di, 0):height+min(di, 0),
+                      max(dj, 0):width+min(dj, 0)] += \
+                    board[max(-di, 0):height+min(-di, 0),
+                          max(-dj, 0):width+min(-dj, 0)]
+
+        return n_map
@@ -0,0 +1,370 @@
+'''this file contains writers which save the states of a sim as an animated
+GIF or as a numbered sequence of PGM images, without Tk.
+
+States are encoded one at a time as they are added, so a run of any length
+can be exported with constant memory.  exporter runs a writer in a worker
+thread fed through a bounded queue, so the sim and the encoding overlap and
+the sim waits when the encoder falls behind.
+
+    with gol_export.exporter(gol_export.gif_writer('run.gif', 64, 64)) as e:
+        for board in gol.iter_states():
+            e.put(board)
+'''
+
+import itertools
+import queue
+import threading
+
+import gol_board
+
+# GIF color indices, dead cells are white and live cells black as in the app
+_PALETTE = bytes([255, 255, 255, 0, 0, 0, 255, 255, 255, 255, 255, 255])
+_TRANSPARENT = 2
+
+# grey level of each cell value in PGM images
+_GREY = bytes([255] + [0]*255)
+
+
+def board_bytes(board):
+    '''Return the cells of a 2d list or board_array as bytes, row by row.'''
+
+    cells = getattr(board, 'cells', None)
+    if cells is not None:
+        return bytes(cells)
+    return b''.join(bytes(row) for row in board)
+
+
+def scale_pixels(pixels, width, scale):
+    '''Return pixels, rows of width bytes, with every cell drawn as a
+    scale x scale square.'''
+
+    if scale == 1:
+        return pixels
+
+    rows = []
+    for i in range(0, len(pixels), width):
+        row = bytes(itertools.chain.from_iterable(
+            zip(*[pixels[i:i+width]]*scale)))
+        rows.extend([row]*scale)
+    return b''.join(rows)
+
+
+def lzw_encode(pixels, min_size):
+    '''Compress pixels, bytes of color indices, into GIF LZW data.
+
+    inputs:
+        pixels, bytes every value less than 2**min_size
+        min_size, int the minimum code size, at least 2
+    output:
+        data, bytes to be split into GIF sub-blocks
+    '''
+
+    clear = 1 << min_size
+    end = clear + 1
+    size = min_size + 1
+    codes = {}
+    next_code = end + 1
+
+    out = bytearray()
+    buf = clear
+    nbits = size
+
+    prefix = None
+    for byte in pixels:
+        if prefix is None:
+            prefix = byte
+            continue
+        key = (prefix, byte)
+        code = codes.get(key)
+        if code is not None:
+            prefix = code
+            continue
+
+        buf |= prefix << nbits
+        nbits += size
+        if next_code < 4096:
+            codes[key] = next_code
+            next_code += 1
+            if next_code > (1 << size) and size < 12:
+                size += 1
+        else:
+            # the table is full, start again
+            buf |= clear << nbits
+            nbits += size
+            codes = {}
+            next_code = end + 1
+            size = min_size + 1
+        prefix = byte
+
+        while nbits >= 8:
+            out.append(buf & 0xFF)
+            buf >>= 8
+            nbits -= 8
+
+    if prefix is not None:
+        buf |= prefix << nbits
+        nbits += size
+        # the decoder widens its codes one code later than the encoder
+        if next_code == (1 << size) and size < 12:
+            size += 1
+    buf |= end << nbits
+    nbits += size
+    while nbits > 0:
+        out.append(buf & 0xFF)
+        buf >>= 8
+        nbits -= 8
+
+    return bytes(out)
+
+
+class gif_writer:
+
+    '''Class writes states to an animated GIF one frame at a time.
+
+    Only the rectangle of cells which changed since the last frame is
+    written, and the unchanged cells inside it are transparent, so frames of
+    mostly still boards are small.
+
+    attributes:
+        path, string the file written
+        width, height, ints the size of the boards in cells
+        scale, int the number of pixels per cell
+        delay, int hundredths of a second each frame is shown
+        frames, int the number of frames written so far
+    '''
+
+    def __init__(self, path, width, height, scale=1, delay=10, loop=True):
+        '''create the file and write the GIF header.
+
+        inputs:
+            path, string the file to write
+            width, height, ints the size of the boards in cells
+            scale, int the number of pixels per cell
+            delay, int hundredths of a second each frame is shown
+            loop, bool if True the animation repeats forever
+        '''
+
+        self.path = path
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.delay = delay
+        self.frames = 0
+        self._last = None
+        self._file = open(path, 'wb')
+
+        f = self._file
+        f.write(b'GIF89a')
+        f.write((width*scale).to_bytes(2, 'little'))
+        f.write((height*scale).to_bytes(2, 'little'))
+        # global color table of 4 colors, background 0, square pixels
+        f.write(bytes([0x81, 0, 0]))
+        f.write(_PALETTE)
+        if loop:
+            f.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')
+
+    def append(self, board):
+        '''Encode board as the next frame.
+
+        input:
+            board, 2d list of ints or board_array of size height x width
+        '''
+
+        cells = board_bytes(board)
+        width = self.width
+        if len(cells) != width * self.height:
+            raise ValueError('board does not match the size of the GIF')
+        left, top, w, h = 0, 0, width, self.height
+        if self._last is not None:
+            changed = [i for i in range(self.height)
+                       if cells[i*width:(i+1)*width] !=
+                       self._last[i*width:(i+1)*width]]
+            if changed:
+                top, h = changed[0], changed[-1] - changed[0] + 1
+                cols = [j for i in changed for j in range(width)
+                        if cells[i*width + j] != self._last[i*width + j]]
+                left, w = min(cols), max(cols) - min(cols) + 1
+            else:
+                # an unchanged frame is a single transparent pixel
+                top, h, left, w = 0, 1, 0, 1
+
+        pixels = bytearray()
+        for i in range(top, top + h):
+            row = cells[i*width + left:i*width + left + w]
+            if self._last is not None:
+                old = self._last[i*width + left:i*width + left + w]
+                row = bytes(_TRANSPARENT if a == b else a
+                            for a, b in zip(row, old))
+            pixels += row
+        self._last = cells
+
+        s = self.scale
+        pixels = scale_pixels(bytes(pixels), w, s)
+        f = self._file
+        # graphic control extension: leave the frame in place, index 2 is
+        # transparent
+        f.write(b'\x21\xf9\x04\x05' + self.delay.to_bytes(2, 'little') +
+                bytes([_TRANSPARENT, 0]))
+        f.write(b'\x2c' + b''.join(n.to_bytes(2, 'little') for n in
+                                   (left*s, top*s, w*s, h*s)) + b'\x00')
+        data = lzw_encode(pixels, 2)
+        f.write(b'\x02')
+        for i in range(0, len(data), 255):
+            block = data[i:i+255]
+            f.write(bytes([len(block)]) + block)
+        f.write(b'\x00')
+        self.frames += 1
+
+    def close(self):
+        '''Write the GIF trailer and close the file.'''
+
+        if self._file.closed:
+            return
+        self._file.write(b'\x3b')
+        self._file.close()
+
+
+class pgm_writer:
+
+    '''Class writes each state to its own binary PGM image.
+
+    attributes:
+        pattern, string file name with a % field for the frame number,
+                 e.g. 'frames/gen_%05d.pgm'
+        scale, int the number of pixels per cell
+        frames, int the number of images written so far
+    '''
+
+    def __init__(self, pattern, scale=1):
+        self.pattern = pattern
+        self.scale = scale
+        self.frames = 0
+
+    def append(self, board):
+        '''Write board to the next numbered image.'''
+
+        width, height = len(board[0]), len(board)
+        pixels = scale_pixels(board_bytes(board).translate(_GREY), width,
+                              self.scale)
+        with open(self.pattern % self.frames, 'wb') as f:
+            f.write(b'P5 %d %d 255\n' % (width*self.scale,
+                                         height*self.scale))
+            f.write(pixels)
+        self.frames += 1
+
+    def close(self):
+        pass
+
+
+class exporter:
+
+    '''Class runs a writer in a worker thread.
+
+    Boards are passed to the worker through a queue holding at most
+    queue_size boards, and put waits while it is full, so memory use does
+    not depend on the length of the run.
+
+    attributes:
+        writer, gif_writer or pgm_writer the boards are written with
+        error, the exception raised by the writer, or None
+    '''
+
+    queue_size = 16
+
+    def __init__(self, writer):
+        '''start a worker thread writing boards with writer.'''
+
+        self.writer = writer
+        self.error = None
+        self._queue = queue.Queue(self.queue_size)
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def _work(self):
+        '''Write boards until None is received.  After an error the rest are
+        thrown away.'''
+
+        for board in iter(self._queue.get, None):
+            if self.error is not None:
+                continue
+            try:
+                self.writer.append(board)
+            except Exception as e:
+                self.error = e
+
+    def put(self, board):
+        '''Queue board to be written, waiting while the queue is full.'''
+
+        if self.error is not None:
+            raise self.error
+        self._queue.put(board)
+
+    def close(self):
+        '''Wait for every queued board to be written and close the writer.
+        Raises the writer's exception if it failed.'''
+
+        self._queue.put(None)
+        self._thread.join()
+        self.writer.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_bounds(gol):
+    '''Return the smallest window holding the start board and every live
+    cell of every generation of a sim on an infinite board.
+
+    The sim is run once without keeping its states, so the window of a run
+    can be found before it is exported.
+
+    input:
+        gol, gol_board with the 'infinite' boundary condition
+    output:
+        bounds, tuple of ints (y0, x0, height, width) as used by
+                gol_board.cells2board
+    '''
+
+    y0, x0 = 0, 0
+    y1, x1 = len(gol.start), len(gol.start[0])
+    for cells in gol.iter_states():
+        for y, x in cells:
+            y0, y1 = min(y0, y), max(y1, y+1)
+            x0, x1 = min(x0, x), max(x1, x+1)
+    return (y0, x0, y1-y0, x1-x0)
+
+
+def export_run(gol, writer, bounds=None):
+    '''Write every generation of gol with writer in a worker thread.
+
+    Every generation is calculated, even if the states repeat, so the output
+    has gol.generations + 1 frames.  states is not changed.
+
+    inputs:
+        gol, gol_board the sim to export
+        writer, gif_writer or pgm_writer
+        bounds, tuple (y0, x0, height, width) the window drawn for the
+                'infinite' boundary condition, it must match the size of
+                writer.  Default the start board.
+    output:
+        frames, int the number of frames written
+    '''
+
+    infinite = gol.boundary_condition == 'infinite'
+    if bounds is None:
+        bounds = (0, 0, len(gol.start), len(gol.start[0]))
+
+    gol.init_rules_table()
+    board = gol.start_state()
+    states = itertools.chain([board], gol.iter_engine(board))
+    with exporter(writer) as e:
+        for board in itertools.islice(states, gol.generations + 1):
+            if infinite:
+                board = gol_board.cells2board(board, *bounds)
+            e.put(board)
+    return writer.frames
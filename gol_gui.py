@@ -1,11 +1,20 @@
 # -*- coding: utf-8 -*-
 
 import tkinter as tk
+import tkinter.filedialog
+import tkinter.messagebox
 
+import copy
 import math
+import os
+import queue
 import random
+import threading
 import time
 import gol_board
+import gol_history
+import gol_timing
+import pattern_io
 import image_utility as imgu
 
 
@@ -18,36 +27,101 @@ class gol_gui:
         canvas, the Canvas object created in main_window
         current, the time point currently being displayed
         timeline, the bottom slider in main_window which controls current
-        scale, how many pixels in the display are used per board cell
+        scale, how many pixels in the display are used per board cell, less
+               than 1 when zoomed out so each pixel shows a block of cells
+        view, list [y, x] the board cell drawn at the top left of the canvas
+        view_size, list [height, width] of the canvas in pixels
+        board_size, list [height, width] of the boards drawn in cells
         generations, the number of generations currently calculated
-        gol, gol_board object containing info on the current simulation
-        imgs, list of PhotoImage which are then drawn to canvas
+        gol, gol_board object containing info on the current simulation, its
+             states are kept in a gol_history
+        frames, frame_cache of PhotoImages of the view, rendered only when
+                they are drawn
+        frame_count, the number of frames which can be drawn
+        bounds, the window of an infinite board which is drawn, see
+                gol_board.dense_bounds
         display, reference to the PhotoImage currently drawn
+        image_item, id of the canvas image item every frame is drawn to
+        prefetch_job, id of the after_idle call rendering frames ahead, or
+                      None
+        playing, bool True while frames are being played
+        loop, bool if True playing starts again from the first frame
+        frame_cost, float seconds a frame recently took to draw, averaged
+        dropped_frames, int frames skipped while playing since play started
+        results, Queue the worker thread puts new states into
+        run_gol, copy of gol which the worker thread runs, so a cancelled
+                 worker which has not stopped yet never changes gol
+        cancel, Event which tells the worker thread to stop
+        status, Label below the timeline showing gol_timing totals
+        timing_var, BooleanVar of the View -> Show Timings check box
     '''
 
+    # ms between checks of the results queue, and the most time spent
+    # rendering new states in a single check
+    poll_delay = 20
+    poll_budget = 0.05
+    queue_size = 64
+
+    # frames rendered ahead of the one being drawn, and the memory the cached
+    # frames may use
+    prefetch_count = 4
+    cache_bytes = 64*2**20
+
+    # ms between updates of the timings in the status bar
+    status_delay = 500
+
+    # frames per second while playing
+    fps = 20
+
+    # the smallest and largest scale the view can be zoomed to
+    min_scale = 2**-10
+    max_scale = 64
+
     def __init__(self):
         '''Initial app setup.  Create and populate main window and load the
         title screen map using default values.
 
-        NOTE: the code is not as fast as I would want, so on some computers
-        opeining the title screen may be egregious.  I tried to choose settings
-        that won't take any time to run but that was only tested on my
-        computer.
+        The sim runs in a worker thread, so the window is shown and can be
+        used while the title screen is still being calculated.
         '''
 
         # setup main_window
         self.main_window = tk.Tk()
         self.__init_menu__()
-        self.canvas = tk.Canvas(self.main_window)
+        self.canvas = tk.Canvas(self.main_window, highlightthickness=0)
         self.canvas.pack()
+        self.canvas.bind('<ButtonPress-1>', self.drag_start)
+        self.canvas.bind('<B1-Motion>', self.drag_move)
+        self.canvas.bind('<MouseWheel>', self.wheel_zoom)
+        self.canvas.bind('<Button-4>', self.wheel_zoom)
+        self.canvas.bind('<Button-5>', self.wheel_zoom)
         self.timeline = tk.Scale(self.main_window,
                                  from_=1, to=100,
                                  orient='horizontal',
                                  command=self.timeline_update)
         self.timeline.pack()
+        self.status = tk.Label(self.main_window, anchor=tk.W,
+                               justify=tk.LEFT)
+        self.status_job = None
+        self.image_item = None
+        self.prefetch_job = None
+        self.playing = False
+        self.loop = True
+        self.play_job = None
+        self.slider_t = None
+        self.frame_cost = 0.0
+        self.dropped_frames = 0
 
         # set default values and open/runS title_creen.gif'
+        self.cancel = threading.Event()
+        self.results = None
+        self.run_gol = None
+        self.frame_count = 0
         self.scale = 1
+        self.view = [0, 0]
+        self.view_size = [1, 1]
+        self.board_size = [1, 1]
+        self.drag = None
         self.generations = 32
         self.open_img('./maps/title_screen.gif')
         self.main_window.mainloop()
@@ -65,10 +139,45 @@ class gol_gui:
         filemenu.add_command(label='New', command=self.new_dialog)
         filemenu.add_command(label='Open...', command=self.browse_img)
         filemenu.add_separator()
+        filemenu.add_command(label='Save Pattern...',
+                             command=self.save_pattern)
+        filemenu.add_separator()
+        filemenu.add_command(label='Open History...',
+                             command=self.browse_history)
+        filemenu.add_command(label='Save History...',
+                             command=self.save_history)
+        filemenu.add_separator()
         filemenu.add_command(label='Exit', command=root.destroy)
         viewmenu = tk.Menu(menu)
         menu.add_cascade(label='View', menu=viewmenu)
         viewmenu.add_command(label='Settings', command=self.setting_dialog)
+        viewmenu.add_command(label='Cancel Run', command=self.stop_run)
+        viewmenu.add_command(label='Play/Pause', command=self.toggle_play,
+                             accelerator='Space')
+        root.bind('<space>', lambda event: self.toggle_play())
+        viewmenu.add_separator()
+        viewmenu.add_command(label='Zoom In', command=self.zoom_view,
+                             accelerator='+')
+        viewmenu.add_command(label='Zoom Out',
+                             command=lambda: self.zoom_view(0.5),
+                             accelerator='-')
+        viewmenu.add_command(label='Zoom to Fit', command=self.fit_view,
+                             accelerator='0')
+        root.bind('<plus>', lambda event: self.zoom_view())
+        root.bind('<equal>', lambda event: self.zoom_view())
+        root.bind('<minus>', lambda event: self.zoom_view(0.5))
+        root.bind('<Key-0>', lambda event: self.fit_view())
+        for key, dy, dx in (('Up', -1, 0), ('Down', 1, 0),
+                            ('Left', 0, -1), ('Right', 0, 1)):
+            root.bind('<%s>' % key,
+                      lambda event, dy=dy, dx=dx: self.pan_view(
+                          dy*self.view_size[0]//8, dx*self.view_size[1]//8))
+        viewmenu.add_separator()
+        self.timing_var = tk.BooleanVar(value=gol_timing.enabled)
+        viewmenu.add_checkbutton(label='Show Timings',
+                                 variable=self.timing_var,
+                                 command=self.toggle_timing)
+        viewmenu.add_command(label='Reset Timings', command=gol_timing.reset)
 
     def new_dialog(self):
         '''Create the dialog box that appears when you click file->new in
@@ -174,44 +283,47 @@ class gol_gui:
         rb1.select()
         rb2 = tk.Radiobutton(top, text='Dead', variable=self.bc_var,
                              value='dead')
+        rb3 = tk.Radiobutton(top, text='Infinite', variable=self.bc_var,
+                             value='infinite')
         rb1.grid(row=0, column=1)
         rb2.grid(row=1, column=1)
+        rb3.grid(row=2, column=1)
 
         # Create parameter labels
         tk.Label(top, text='Boundary Condition').grid(row=0, column=0)
 
-        tk.Label(top, text='Born Numbers:').grid(row=2, column=0, sticky='e')
-        tk.Label(top, text='Survive Numbers:').grid(row=3,
+        tk.Label(top, text='Born Numbers:').grid(row=3, column=0, sticky='e')
+        tk.Label(top, text='Survive Numbers:').grid(row=4,
                                                     column=0, sticky='e')
-        tk.Label(top, text='Generations: ').grid(row=4, column=0, sticky='e')
-        tk.Label(top, text='Neighborhood Radius: ').grid(row=5,
+        tk.Label(top, text='Generations: ').grid(row=5, column=0, sticky='e')
+        tk.Label(top, text='Neighborhood Radius: ').grid(row=6,
                                                          column=0, sticky='e')
 
         # Create parameter entry points and set default values
         born_entry = tk.Entry(top, name='born_entry')
         born_entry.insert(0, '3')
-        born_entry.grid(row=2, column=1)
+        born_entry.grid(row=3, column=1)
 
         born_entry = tk.Entry(top, name='survive_entry')
         born_entry.insert(0, '2, 3')
-        born_entry.grid(row=3, column=1)
+        born_entry.grid(row=4, column=1)
 
         gen_scale = tk.Scale(top, from_=1, to=512, name='gen_scale')
         gen_scale.config(orient='horizontal')
         gen_scale.set(64)
-        gen_scale.grid(row=4, column=1)
+        gen_scale.grid(row=5, column=1)
 
         rad_scale = tk.Scale(top, from_=1, to=5, name='rad_scale')
         rad_scale.config(orient='horizontal')
         rad_scale.set(1)
-        rad_scale.grid(row=5, column=1)
+        rad_scale.grid(row=6, column=1)
 
         # Create ok and cancel buttons.
         ok_butt = tk.Button(top, text='Ok', command=self.set_settings)
-        ok_butt.grid(row=6, column=1)
+        ok_butt.grid(row=7, column=1)
 
         cancel_butt = tk.Button(top, text='cancel', command=top.destroy)
-        cancel_butt.grid(row=6, column=0)
+        cancel_butt.grid(row=7, column=0)
 
     def set_settings(self):
         '''Take parameters given in the settings dialog box and re-run the
@@ -233,108 +345,492 @@ class gol_gui:
                                     be integers seperated with commas.')
             return
 
+        if 0 in born and self.bc_var.get() == 'infinite':
+            tk.messagebox.showerror('Error',
+                                    'Born number 0 can not be used with an \
+                                    infinite board.')
+            return
+
+        self.cancel_run()
         self.gol.boundary_condition = self.bc_var.get()
         self.gol.k_radius = int(self.top.nametowidget('rad_scale').get())
         self.gol.generations = int(self.top.nametowidget('gen_scale').get())
         self.gol.born_numbers = born
         self.gol.survive_numbers = survive
 
-        self.gol.run()
-        board = self.gol.states[0]
-
-        self.scale = self.set_img_scale(board)
-        self.imgs = imgu.all_board2img(self.gol.states)
-        self.draw_img(self.imgs[0])
-        self.current = 0
-
-        self.update_canvas(board)
-        self.timeline.config(to=len(self.imgs),
-                             length=self.display.width())
-        self.timeline.pack()
-
         self.top.destroy()
+        self.run_sim()
 
     def open_img(self, path):
-        '''Load an image from location path and use it to start a new sim.
-        Throws TclError if file is not found and does nothing.
+        '''Load an image or pattern file from location path and use it to
+        start a new sim.  Does nothing if the file is not found or can not be
+        read.
+
+        Pattern files (see pattern_io) also set the rules of the new sim if
+        they hold any.
 
         inputs:
             path, string loacting the file path
         '''
 
+        rules = {}
         try:
-            img = tk.PhotoImage(file=path)
-        except tk.TclError:
+            if pattern_io.is_pattern(path):
+                board, rules = pattern_io.load_board(path, margin=2)
+            else:
+                board = imgu.load_board(path)
+        except (OSError, ValueError, tk.TclError):
             return
 
-        board = imgu.img2board(img)
-
-        self.new_start_board(board, self.generations)
+        self.new_start_board(board, self.generations, rules)
 
     def browse_img(self):
         '''Select an image from a file browser and use it tostart a new sim.'''
 
-        filetypes = (('gif images', '*.gif'), ('all files', '*.*'))
+        filetypes = (('gif images', '*.gif'),
+                     ('patterns', ' '.join('*' + ext
+                                           for ext in pattern_io.EXTENSIONS)),
+                     ('all files', '*.*'))
 
         path = tk.filedialog.askopenfilename(initialdir='./maps',
                                              title='Select File',
                                              filetypes=filetypes)
-        if path is None:
+        if not path:
             return
-        img = tk.PhotoImage(file=path)
-        board = imgu.img2board(img)
-        self.new_start_board(board, self.generations)
+        self.open_img(path)
 
-    def play(self, loop, delay):
-        '''Display all images in self.imgs in sucession.
+    def browse_history(self):
+        '''Select a history file from a file browser and show the sim saved
+        in it.
+
+        The file is memory mapped, so only the frames which are drawn are
+        read from disk.
+        '''
+
+        filetypes = (('gol histories', '*.golh'), ('all files', '*.*'))
+        path = tk.filedialog.askopenfilename(title='Select File',
+                                             filetypes=filetypes)
+        if not path:
+            return
+
+        try:
+            gol = gol_board.open_history(path)
+        except (OSError, ValueError) as e:
+            tk.messagebox.showerror('Error', str(e))
+            return
+
+        self.cancel_run()
+        self.pause()
+        self.cancel_prefetch()
+        self.close_history()
+        self.gol = gol
+        self.frame_count = len(gol.states)
+        if gol.period is not None:
+            self.frame_count = gol.generations + 1
+        self.show_first(self.get_board(0))
+
+    def close_history(self):
+        '''Close the history file the states of the current sim are read
+        from, if any, before the sim or its states are replaced.'''
+
+        states = getattr(getattr(self, 'gol', None), 'states', None)
+        if isinstance(states, gol_history.history_file):
+            states.close()
+
+    def save_pattern(self):
+        '''Save the frame currently drawn to a pattern file chosen in a file
+        browser.  The format is chosen by the extension.'''
+
+        filetypes = (('RLE', '*.rle'), ('Life 1.06', '*.lif'),
+                     ('macrocell', '*.mc'))
+        path = tk.filedialog.asksaveasfilename(title='Save Pattern',
+                                               defaultextension='.rle',
+                                               filetypes=filetypes)
+        if not path:
+            return
+
+        state = self.gol.get_state(self.current)
+        if self.gol.boundary_condition != 'infinite':
+            state = gol_board.board2cells(state)
+        try:
+            pattern_io.save_pattern(path, state, self.gol.born_numbers,
+                                    self.gol.survive_numbers)
+        except (OSError, ValueError) as e:
+            tk.messagebox.showerror('Error', str(e))
+
+    def save_history(self):
+        '''Save the states calculated so far to a history file chosen in a
+        file browser.
+
+        The file is written beside path and moved over it once complete.
+        Saving over the history file the sim was opened from first copies
+        its states into a gol_history and closes it, since a file which is
+        memory mapped can not be replaced on Windows.
+        '''
+
+        if self.gol.boundary_condition == 'infinite':
+            tk.messagebox.showerror('Error', 'Infinite boards can not be \
+                                    saved as a history.')
+            return
+
+        filetypes = (('gol histories', '*.golh'), ('all files', '*.*'))
+        path = tk.filedialog.asksaveasfilename(title='Save History',
+                                               defaultextension='.golh',
+                                               filetypes=filetypes)
+        if not path:
+            return
+
+        states = self.gol.states
+        try:
+            if isinstance(states, gol_history.history_file) and \
+                    os.path.exists(path) and os.path.samefile(path,
+                                                              states.path):
+                history = gol_history.gol_history()
+                for t in range(len(states)):
+                    history.append(states[t])
+                states.close()
+                self.gol.states = states = history
+            with gol_history.history_writer(path, self.gol) as writer:
+                for t in range(len(states)):
+                    writer.append(states[t])
+        except OSError as e:
+            tk.messagebox.showerror('Error', str(e))
+
+    def toggle_play(self):
+        '''Start playing from the frame shown, or pause if playing.'''
+
+        if self.playing:
+            self.pause()
+        else:
+            self.play()
+
+    def play(self, loop=True, fps=None):
+        '''Play the frames in order from the frame shown.
+
+        Frames are drawn by play_tick from the Tk event loop, so the window
+        stays responsive while playing.
 
         inputs:
-            loop, boolean if True, the current frame loops
-            delay, float number of seconds to delay between renders
+            loop, boolean if True, playing starts again after the last frame
+            fps, float frames per second, default the fps attribute
         '''
 
-        t = self.current
+        if self.frame_count == 0:
+            return
+        if fps is not None:
+            self.fps = fps
+        self.loop = loop
+        self.pause()
         self.playing = True
-        while(t < len(self.gol.states)):
+        self.dropped_frames = 0
+        self.restart_clock(self.current)
+        self.play_tick()
 
-            self.draw_img(self.imgs[t])
-            self.timeline.set(int(t+1))
+    def pause(self):
+        '''Stop playing and keep the current frame shown.'''
 
-            t += 1
-            self.current = t
-            if(loop and t == len(self.gol.states)):
-                t = 0
+        self.playing = False
+        if self.play_job is not None:
+            self.main_window.after_cancel(self.play_job)
+            self.play_job = None
 
-            time.sleep(delay)
+    def restart_clock(self, t):
+        '''Make playing continue at the fps from frame t, shown now.'''
 
-            if self.playing is False:
-                break
+        self.play_origin = t
+        self.play_start = time.perf_counter()
+
+    def play_tick(self):
+        '''Draw the frame due at the current time and schedule the next
+        call.
 
-    def new_start_board(self, board, generations):
+        The frame drawn is chosen by the time since playing started, so when
+        frames take longer to draw than 1/fps the ones in between are
+        skipped rather than making playing slower.  The next call is
+        scheduled for when the next frame is due, less the time frames have
+        recently taken to draw.
+        '''
+
+        self.play_job = None
+        if not self.playing or self.frame_count == 0:
+            self.playing = False
+            return
+
+        # the frame which will be due once it has been drawn
+        elapsed = time.perf_counter() - self.play_start + self.frame_cost
+        due = self.play_origin + int(elapsed * self.fps)
+        if due >= self.frame_count:
+            if not self.loop:
+                due = self.frame_count - 1
+                self.playing = False
+            else:
+                due = 0
+                self.restart_clock(0)
+
+        if due != self.current:
+            if due > self.current + 1:
+                self.dropped_frames += due - self.current - 1
+            start = time.perf_counter()
+            self.show_frame(due, 1)
+            self.slider_t = due
+            self.timeline.set(due + 1)
+            cost = time.perf_counter() - start
+            self.frame_cost = 0.8*self.frame_cost + 0.2*cost
+
+        if not self.playing:
+            return
+
+        interval = 1 / self.fps
+        elapsed = time.perf_counter() - self.play_start + self.frame_cost
+        wait = max(interval - elapsed % interval, 0.001)
+        self.play_job = self.main_window.after(int(wait*1000),
+                                               self.play_tick)
+
+    def new_start_board(self, board, generations, rules=None):
         '''Run a new sim from starting state board, and performs all GUI
         updates necessary.
 
         inputs:
             board, 2d list the new starting state
             generations, int the number of generations to run the sim
+            rules, dict of gol_board attributes set on the new sim
         '''
 
-        self.scale = self.set_img_scale(board)
-        self.gol = gol_board.gol_board(board, generations)
-        self.imgs = imgu.all_board2img(self.gol.states)
-        self.draw_img(self.imgs[0])
+        self.cancel_run()
+        self.close_history()
+        self.gol = gol_board.gol_board(board, generations, run=False)
+        # step functions compiled for the rules, every setting the GUI
+        # offers is supported and they are cached across runs
+        self.gol.engine = 'compiled'
+        # frames past a repeat are found with get_state
+        self.gol.detect_cycles = True
+        for key, value in (rules or {}).items():
+            setattr(self.gol, key, value)
+        self.run_sim()
+
+    def run_sim(self):
+        '''Start running the current sim in a worker thread.
+
+        States are passed back through self.results and rendered by
+        poll_results, so the first state is drawn straight away and the
+        timeline grows as the rest arrive.  The worker runs its own copy of
+        the sim, so a cancelled worker can not change the sim shown or the
+        next run.
+        '''
+
+        self.pause()
+        self.cancel_prefetch()
+        self.close_history()
+        self.gol.states = gol_history.gol_history()
+        self.frame_count = 0
         self.current = 0
 
+        self.cancel = threading.Event()
+        self.results = queue.Queue(self.queue_size)
+        self.run_gol = copy.copy(self.gol)
+        worker = threading.Thread(target=self.worker,
+                                  args=(self.run_gol, self.results,
+                                        self.cancel),
+                                  daemon=True)
+        worker.start()
+        self.main_window.after(self.poll_delay, self.poll_results,
+                               self.results)
+
+    def worker(self, gol, results, cancel):
+        '''Calculate every state of gol and put them in results.
+
+        Runs in a worker thread.  None is put in results when the run ends,
+        or the exception if it failed.  The worker waits while results is
+        full so unrendered states do not pile up.
+
+        inputs:
+            gol, gol_board the sim to run
+            results, Queue receiving each state
+            cancel, Event which stops the run when it is set
+        '''
+
+        def send(item):
+            while not cancel.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            for board in gol.iter_states():
+                if not send(board):
+                    return
+        except Exception as e:
+            send(e)
+            return
+        send(None)
+
+    def poll_results(self, results):
+        '''Render the states the worker has finished since the last call and
+        schedule the next call.
+
+        Infinite boards change size as they run, so they are only drawn once
+        every state is known.
+
+        input:
+            results, Queue of the run being shown. Calls for an older run,
+                     which has been replaced, do nothing.
+        '''
+
+        if results is not self.results:
+            return
+
+        infinite = self.gol.boundary_condition == 'infinite'
+        stop = time.perf_counter() + self.poll_budget
+        while time.perf_counter() < stop:
+            try:
+                board = results.get_nowait()
+            except queue.Empty:
+                break
+
+            if board is None:
+                self.results = None
+                self.gol.cycle_start = self.run_gol.cycle_start
+                self.gol.period = self.run_gol.period
+                if infinite:
+                    self.show_infinite()
+                elif self.gol.period is not None:
+                    # the states repeat, later frames reuse earlier states
+                    self.frame_count = self.gol.generations + 1
+                    self.timeline.config(to=self.frame_count)
+                return
+            if isinstance(board, Exception):
+                self.results = None
+                tk.messagebox.showerror('Error', str(board))
+                return
+
+            self.gol.states.append(board)
+            if infinite:
+                continue
+
+            self.frame_count = len(self.gol.states)
+            if self.frame_count == 1:
+                self.show_first(board)
+            self.timeline.config(to=self.frame_count)
+
+        self.main_window.after(self.poll_delay, self.poll_results, results)
+
+    def cancel_run(self):
+        '''Stop the sim running in the worker thread, if any.  The states
+        calculated so far are kept.'''
+
+        self.cancel.set()
+        self.results = None
+
+    def stop_run(self):
+        '''Cancel the current run and show the states calculated so far.'''
+
+        running = self.results is not None
+        self.cancel_run()
+        if running and self.gol.boundary_condition == 'infinite' \
+                and len(self.gol.states) > 0:
+            self.show_infinite()
+
+    def show_infinite(self):
+        '''Draw the states of an infinite board once they are calculated.
+
+        Every frame is drawn in the window holding all of the states, so the
+        frames all have the same size.
+        '''
+
+        self.bounds = self.gol.dense_bounds()
+        self.frame_count = len(self.gol.states)
+        if self.gol.period is not None:
+            self.frame_count = self.gol.generations + 1
+        self.show_first(self.get_board(0))
+
+    def show_first(self, board):
+        '''Resize the canvas and timeline for board and draw the first frame.
+
+        A new frame cache is made since the scale may have changed.  The view
+        is reset to show the whole board.
+
+        input:
+            board, 2d list the first state of the sim
+        '''
+
+        self.scale = self.set_img_scale(board)
+        self.view = [0, 0]
         self.update_canvas(board)
-        self.timeline.config(to=len(self.imgs),
+        self.frames = imgu.frame_cache(self.render_frame, self.cache_bytes)
+        self.show_frame(0, 1)
+        self.timeline.config(to=self.frame_count,
                              length=self.display.width())
         self.timeline.pack()
 
+    def get_board(self, t):
+        '''Return the state at time t as a 2d list.'''
+
+        state = self.gol.get_state(t)
+        if self.gol.boundary_condition == 'infinite':
+            return gol_board.cells2board(state, *self.bounds)
+        return state
+
+    def render_frame(self, t):
+        '''Render the part of the state at time t inside the view as a
+        PhotoImage the size of the canvas.'''
+
+        return imgu.view2img(self.get_board(t), *self.view, *self.view_size,
+                             self.scale)
+
+    def show_frame(self, t, direction):
+        '''Draw frame t and render the next few frames ahead of time.
+
+        inputs:
+            t, int the frame to draw
+            direction, 1 or -1 whether the next frames shown are likely to be
+                       after or before t
+        '''
+
+        self.draw_img(self.frames.get(t))
+        self.current = t
+
+        ahead = [t + direction*i for i in range(1, self.prefetch_count+1)]
+        ahead = [i for i in ahead if 0 <= i < self.frame_count]
+        self.cancel_prefetch()
+        self.prefetch_job = self.main_window.after_idle(self.prefetch,
+                                                        self.frames, ahead)
+
+    def prefetch(self, frames, ts):
+        '''Render frames ts into the cache frames while idle.
+
+        Does nothing if a new sim has replaced frames since the call was
+        scheduled, and skips frames the current sim does not have.
+        '''
+
+        self.prefetch_job = None
+        if frames is not self.frames:
+            return
+        frames.prefetch([t for t in ts if 0 <= t < self.frame_count])
+
+    def cancel_prefetch(self):
+        '''Cancel the pending prefetch, if any.'''
+
+        if self.prefetch_job is not None:
+            self.main_window.after_cancel(self.prefetch_job)
+            self.prefetch_job = None
+
     def timeline_update(self, t):
         '''Update the drawn image whenever the timeline slider is moved.'''
 
-        self.draw_img(self.imgs[int(t)-1])
-        self.current = int(t)-1
+        if self.frame_count == 0:
+            return
+
+        t = min(int(t), self.frame_count) - 1
+        if t == self.current or (self.playing and t == self.slider_t):
+            # set by play_tick, the frame is already drawn
+            return
+        self.show_frame(t, 1 if t >= self.current else -1)
+        if self.playing:
+            # carry on playing from where the slider was moved to
+            self.restart_clock(t)
 
     def update_canvas(self, board):
         '''Adjust the size of canvas based on the size of 2d list board.
@@ -348,35 +844,161 @@ class gol_gui:
         scale = self.set_img_scale(board)
         size = self.get_size(board)
 
-        self.canvas.config(width=size[1]*scale,
-                           height=size[0]*scale)
+        self.board_size = size
+        self.view_size = [max(math.ceil(size[0]*scale), 1),
+                          max(math.ceil(size[1]*scale), 1)]
+        self.canvas.config(width=self.view_size[1],
+                           height=self.view_size[0])
         self.canvas.pack()
 
     def draw_board(self, board):
-        '''Convert board to an img and draw it to the canvas.
+        '''Draw the part of board inside the view to the canvas.
 
         input:
             board, 2d list
         '''
-        img = imgu.board2img(board)
-        self.draw_img(img)
+        self.draw_img(imgu.view2img(board, *self.view, *self.view_size,
+                                    self.scale))
+
+    def set_view(self, y, x, scale):
+        '''Move the view so cell (y, x) is at the top left of the canvas and
+        draw it at scale pixels per cell.
+
+        The view is kept so at least part of the board is on the canvas.
+        Cached frames are of the old view, so they are thrown away and the
+        frame shown is drawn again.
+
+        inputs:
+            y, x, numbers the cell at the top left of the canvas
+            scale, number pixels per cell, see set_img_scale
+        '''
+
+        if self.frame_count == 0:
+            return
+        height, width = self.board_size
+        scale = min(max(scale, self.min_scale), self.max_scale)
+        y = min(max(round(y), 1 - math.ceil(self.view_size[0]/scale)),
+                height - 1)
+        x = min(max(round(x), 1 - math.ceil(self.view_size[1]/scale)),
+                width - 1)
+        if [y, x] == self.view and scale == self.scale:
+            return
+
+        self.view = [y, x]
+        self.scale = scale
+        self.frames.clear()
+        self.draw_img(self.frames.get(self.current))
+
+    def pan_view(self, dy, dx):
+        '''Move the view by dy, dx pixels of the canvas.'''
+
+        self.set_view(self.view[0] + dy/self.scale,
+                      self.view[1] + dx/self.scale, self.scale)
+
+    def zoom_view(self, factor=2, py=None, px=None):
+        '''Multiply the scale by factor, keeping the cell under the canvas
+        pixel (py, px) in place.  Zooms about the centre of the canvas if
+        py and px are None.
+
+        Scales of 1 or more are whole pixels per cell and scales below 1 are
+        whole cells per pixel, so zooming moves through powers of two.
+        '''
+
+        if py is None:
+            py, px = self.view_size[0]/2, self.view_size[1]/2
+        scale = self.scale*factor
+        if scale >= 1:
+            scale = max(round(scale), 1)
+        else:
+            scale = 1/max(round(1/scale), 1)
+        self.set_view(self.view[0] + py/self.scale - py/scale,
+                      self.view[1] + px/self.scale - px/scale, scale)
+
+    def fit_view(self):
+        '''Zoom and pan so the whole board fits on the canvas again.'''
+
+        height, width = self.board_size
+        scale = min(self.view_size[0]/height, self.view_size[1]/width)
+        if scale >= 1:
+            scale = math.floor(scale)
+        else:
+            scale = 1/2**math.ceil(math.log2(1/scale))
+        self.set_view(0, 0, scale)
+
+    def drag_start(self, event):
+        '''Remember where a drag to pan the view started.'''
+        self.drag = (event.y, event.x, self.view[0], self.view[1])
+
+    def drag_move(self, event):
+        '''Pan the view so the cell grabbed by drag_start follows the
+        mouse.'''
+
+        if self.drag is None:
+            return
+        y, x, view_y, view_x = self.drag
+        self.set_view(view_y - (event.y - y)/self.scale,
+                      view_x - (event.x - x)/self.scale, self.scale)
+
+    def wheel_zoom(self, event):
+        '''Zoom in or out about the mouse pointer when the wheel is turned.
+        X11 sends buttons 4 and 5, other platforms send MouseWheel with a
+        delta.'''
+
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            factor = 2
+        else:
+            factor = 0.5
+        self.zoom_view(factor, event.y, event.x)
+        if self.drag is not None:
+            self.drag_start(event)
 
     def draw_img(self, img):
-        '''Draw img to the canvas.
+        '''Draw img, which is the size of the canvas, to the canvas.
+
+        Every frame is drawn by changing the image of the same canvas item,
+        and the canvas is redrawn by the Tk event loop when it is idle.
 
         input:
             img, PhotoImage
         '''
 
-        self.canvas.delete('all')
-        self.display = img.zoom(x=self.scale, y=self.scale)
-        self.canvas.create_image(0, 0, image=self.display, anchor=tk.NW)
-        self.canvas.update()
+        with gol_timing.phase('canvas'):
+            self.display = img
+            if self.image_item is None:
+                self.image_item = self.canvas.create_image(
+                    0, 0, image=self.display, anchor=tk.NW)
+            else:
+                self.canvas.itemconfig(self.image_item, image=self.display)
+
+    def toggle_timing(self):
+        '''Turn gol_timing on or off from View -> Show Timings, and show or
+        hide the status bar holding the totals.'''
+
+        gol_timing.enabled = self.timing_var.get()
+        if self.status_job is not None:
+            self.main_window.after_cancel(self.status_job)
+            self.status_job = None
+        if gol_timing.enabled:
+            self.status.pack(fill=tk.X)
+            self.update_status()
+        else:
+            self.status.pack_forget()
+
+    def update_status(self):
+        '''Show the current gol_timing totals in the status bar and schedule
+        the next update.  toggle_timing cancels the update when timing is
+        turned off.'''
+
+        self.status.config(text=gol_timing.report() or 'no timings yet')
+        self.status_job = self.main_window.after(self.status_delay,
+                                                 self.update_status)
 
     def set_img_scale(self, board):
         '''Calculate appropriate image scaling to use based on sim size and
         screen reoslution.
 
+        Boards larger than the screen are zoomed out, drawing blocks of 2, 4,
+        8... cells as one pixel, so the scale can be less than 1.
         Scale is calculated such that the canvas is not wider than the screen
         nor is it taller than 75% of the screen.
 
@@ -390,10 +1012,11 @@ class gol_gui:
         width = root.winfo_screenwidth()
         height = root.winfo_screenheight()
 
-        self.scale = min(math.floor(width/size[1]),
-                         math.floor(height*.75/size[0]))
-
-        self.scale = max(self.scale, 1)
+        scale = min(width/size[1], height*.75/size[0])
+        if scale >= 1:
+            self.scale = math.floor(scale)
+        else:
+            self.scale = 1/2**math.ceil(math.log2(1/scale))
 
         return self.scale
 
@@ -0,0 +1,318 @@
+'''this file contains compact stores for every state of a sim.
+
+gol_history keeps the states in memory.  A full keyframe is kept every few
+states and the states in between are kept as the rows which changed since the
+previous state.  Any state can be rebuilt from the keyframe before it.
+
+history_writer and history_file save the states to disk instead.  The file
+starts with a header holding the rules and size of the board, followed by
+every state bit packed as in bit_board.  Every state takes the same number of
+bytes, so history_file memory maps the file and reads any state straight from
+its offset without loading the rest.
+'''
+
+import mmap
+import os
+import struct
+import tempfile
+
+import bit_board
+
+
+class gol_history:
+
+    '''Class stores the states of a sim as keyframes and deltas.
+
+    Boards given as 2d lists are bit packed with bit_board and each delta is
+    the xor of the rows which changed.  Boards given as sets of live cells
+    (the 'infinite' boundary condition) store the symmetric difference of the
+    sets instead.  Indexing returns the same kind of board that was added.
+
+    attributes:
+        interval, int a full keyframe is stored every interval states
+        width, int the width of the 2d list boards, None for sets
+        keyframes, list of keyframes, tuples of packed rows or frozensets
+        deltas, list with one delta for every state, None for keyframes
+    '''
+
+    def __init__(self, interval=32):
+        '''create an empty history.
+
+        input:
+            interval, int the number of states between keyframes
+        '''
+
+        self.interval = interval
+        self.width = None
+        self.keyframes = []
+        self.deltas = []
+        self._last = None
+        self._cache = None
+
+    def __len__(self):
+        return len(self.deltas)
+
+    def append(self, board):
+        '''Add the next state to the end of the history.
+
+        input:
+            board, 2d list of ints or set of (y, x) positions of live cells
+        '''
+
+        if isinstance(board, (set, frozenset)):
+            state = frozenset(board)
+        else:
+            self.width = len(board[0])
+            state = tuple(bit_board.pack_board(board))
+
+        if len(self.deltas) % self.interval == 0:
+            self.keyframes.append(state)
+            self.deltas.append(None)
+        elif isinstance(state, frozenset):
+            self.deltas.append(state ^ self._last)
+        else:
+            self.deltas.append(tuple((i, row ^ last) for i, (row, last)
+                                     in enumerate(zip(state, self._last))
+                                     if row != last))
+
+        self._last = state
+
+    def __getitem__(self, t):
+        '''Rebuild and return the state at time t.
+
+        The last rebuilt state is remembered, so stepping forward through the
+        history only applies one delta per state.
+        '''
+
+        if t < 0:
+            t += len(self)
+        if t < 0 or t >= len(self):
+            raise IndexError('gol_history index out of range')
+
+        key = t // self.interval
+        if self._cache is not None and self._cache[0] // self.interval == key \
+                and self._cache[0] <= t:
+            start, state = self._cache
+        else:
+            start, state = key * self.interval, self.keyframes[key]
+
+        if isinstance(state, frozenset):
+            for delta in self.deltas[start+1:t+1]:
+                state = state ^ delta
+            self._cache = (t, state)
+            return set(state)
+
+        rows = list(state)
+        for delta in self.deltas[start+1:t+1]:
+            for i, diff in delta:
+                rows[i] ^= diff
+        self._cache = (t, tuple(rows))
+        return bit_board.unpack_board(rows, self.width)
+
+
+# magic, version, header size, k_radius, boundary condition, height, width,
+# generations, cycle_start and period, followed by the born and survive masks
+_HEADER = struct.Struct('<4sHHHHIIIii')
+_MAGIC = b'GOLH'
+_VERSION = 1
+_BOUNDARY_CONDITIONS = ['torus', 'dead']
+
+
+def _mask_bytes(k_radius):
+    '''Return the length of the born and survive masks for k_radius.'''
+    return ((2*k_radius + 1)**2 + 7) // 8
+
+
+class history_writer:
+
+    '''Class writes the states of a sim to a history file one at a time.
+
+    The header is written when the file is opened and again when it is
+    closed, so the cycle found by the sim is saved too.  The states are
+    written to a temporary file next to path, which replaces path when the
+    writer is closed, so a history_file reading the old file at path is not
+    changed under it.  If the with block raises, the temporary file is
+    removed and path is left as it was.
+
+        with gol_history.history_writer(path, gol) as writer:
+            for board in gol.iter_states():
+                writer.append(board)
+
+    attributes:
+        gol, gol_board whose rules are saved in the header
+        path, string the file written
+        frames, int the number of states written so far
+    '''
+
+    def __init__(self, path, gol):
+        '''create the file at path and write its header.
+
+        inputs:
+            path, string the file to write, it is replaced when the writer
+                  is closed if it exists
+            gol, gol_board the sim being saved, its boundary condition must
+                 be 'torus' or 'dead'
+        '''
+
+        if gol.boundary_condition not in _BOUNDARY_CONDITIONS:
+            raise ValueError("history files only support the 'torus' and "
+                             "'dead' boundary conditions")
+
+        self.gol = gol
+        self.path = path
+        self.frames = 0
+        self._height, self._width = len(gol.start), len(gol.start[0])
+        self._row_bytes = (self._width + 7) // 8
+        fd, self._temp = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        self._file = os.fdopen(fd, 'wb')
+        try:
+            self._write_header()
+        except BaseException:
+            self.abort()
+            raise
+
+    def _write_header(self):
+        '''Write the header at the start of the file.'''
+
+        gol = self.gol
+        n = _mask_bytes(gol.k_radius)
+        masks = b''
+        for numbers in [gol.born_numbers, gol.survive_numbers]:
+            mask = 0
+            for num in numbers:
+                if 0 <= num < n*8:
+                    mask |= 1 << num
+            masks += mask.to_bytes(n, 'little')
+
+        # frames start on a 64 byte boundary
+        size = -(-(_HEADER.size + len(masks)) // 64) * 64
+        header = _HEADER.pack(
+            _MAGIC, _VERSION, size, gol.k_radius,
+            _BOUNDARY_CONDITIONS.index(gol.boundary_condition),
+            self._height, self._width, gol.generations,
+            -1 if gol.cycle_start is None else gol.cycle_start,
+            -1 if gol.period is None else gol.period)
+
+        self._file.seek(0)
+        self._file.write((header + masks).ljust(size, b'\0'))
+        self._file.seek(0, 2)
+
+    def append(self, board):
+        '''Write the next state to the end of the file.
+
+        input:
+            board, 2d list of ints or board_array the same size as the start
+                   board
+        '''
+
+        self._file.write(b''.join(row.to_bytes(self._row_bytes, 'little')
+                                  for row in bit_board.pack_board(board)))
+        self.frames += 1
+
+    def close(self):
+        '''Write the final header, close the file and move it to path.'''
+
+        if self._file.closed:
+            return
+        try:
+            self._write_header()
+            self._file.close()
+            os.replace(self._temp, self.path)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self):
+        '''Close and remove the temporary file without touching path.'''
+
+        self._file.close()
+        if os.path.exists(self._temp):
+            os.remove(self._temp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class history_file:
+
+    '''Class reads the states of a history file through a memory map.
+
+    Indexing returns the state at that time as a 2d list, like gol_history,
+    and only that state is read from the file.
+
+    attributes:
+        path, string the file read
+        born_numbers, survive_numbers, lists of ints the rules of the sim
+        k_radius, int the neighborhood radius
+        boundary_condition, string 'torus' or 'dead'
+        height, width, ints the size of the board
+        generations, int the number of generations the sim was run for
+        cycle_start, period, ints describing the cycle found by the sim, or
+                             None
+    '''
+
+    def __init__(self, path):
+        '''open and memory map the history file at path.'''
+
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size or header[:4] != _MAGIC:
+                raise ValueError('%s is not a history file' % path)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self._offset, self.k_radius, bc, self.height,
+         self.width, self.generations, cycle_start,
+         period) = _HEADER.unpack(header)
+        if version != _VERSION:
+            self._map.close()
+            raise ValueError('unsupported history file version %d' % version)
+
+        self.boundary_condition = _BOUNDARY_CONDITIONS[bc]
+        self.cycle_start = None if cycle_start < 0 else cycle_start
+        self.period = None if period < 0 else period
+
+        n = _mask_bytes(self.k_radius)
+        masks = self._map[_HEADER.size:_HEADER.size + 2*n]
+        born = int.from_bytes(masks[:n], 'little')
+        survive = int.from_bytes(masks[n:], 'little')
+        self.born_numbers = [i for i in range(n*8) if born >> i & 1]
+        self.survive_numbers = [i for i in range(n*8) if survive >> i & 1]
+
+        self._row_bytes = (self.width + 7) // 8
+        self._frame_bytes = self._row_bytes * self.height
+
+    def __len__(self):
+        # a file which was not closed may end part way through a state
+        return (len(self._map) - self._offset) // self._frame_bytes
+
+    def __getitem__(self, t):
+        '''Read and return the state at time t as a 2d list.'''
+
+        if t < 0:
+            t += len(self)
+        if t < 0 or t >= len(self):
+            raise IndexError('history_file index out of range')
+
+        start = self._offset + t * self._frame_bytes
+        rb = self._row_bytes
+        rows = [int.from_bytes(self._map[i:i+rb], 'little')
+                for i in range(start, start + self._frame_bytes, rb)]
+        return bit_board.unpack_board(rows, self.width)
+
+    def close(self):
+        '''Close the memory map.'''
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,206 @@
+'''this file generates step functions specialised for one set of rules,
+neighborhood radius and boundary condition.
+
+The source of each step function is written with the rules table and the
+radius filled in as constants and, for small radii, the loop over the kernel
+offsets unrolled, then compiled with exec.  Compiled functions are kept in a cache keyed by
+(born_numbers, survive_numbers, k_radius, boundary_condition), so runs and
+settings changes which go back to the same rules reuse them.
+
+    step = gol_kernel.get_step([3], [2, 3], 1, 'torus')
+    board = step(board)
+
+For 'torus' and 'dead' each row is padded, summed along the row and then
+down the columns, and the next state is looked up in a tuple indexed by
+total + (2k+1)**2 * alive.  Up to unroll_radius the sums add the 2k+1
+shifted copies written out one by one, for larger radii they are differences
+of running sums, which cost the same for any k.  For 'infinite' the neighbor
+counts of every live cell's offsets are written out one after another.
+'''
+
+# (born_numbers, survive_numbers, k_radius, boundary_condition) -> function
+_kernels = {}
+
+# the largest radius whose sums are written out offset by offset, changing
+# it only affects step functions compiled after clear_cache
+unroll_radius = 1
+
+
+def rules_tuple(born_numbers, survive_numbers, k):
+    '''Return the next state of a cell indexed by total + size*alive, where
+    total counts the live cells in the kernel including the cell itself and
+    size is (2k+1)**2.
+
+    inputs:
+        born_numbers, survive_numbers, lists of ints the rules
+        k, int the neighborhood radius
+    output:
+        rules, tuple of 0s and 1s of length 2*size + 1
+    '''
+
+    size = (2*k+1)**2
+    rules = [0]*(2*size + 1)
+    for n in born_numbers:
+        if 0 <= n < size:
+            rules[n] = 1
+    for n in survive_numbers:
+        if 0 <= n < size:
+            rules[n + 1 + size] = 1
+    return tuple(rules)
+
+
+def _names(prefix, k):
+    '''Return the 2k+1 variable names used for the unrolled offsets.'''
+    return ['%s%d' % (prefix, i) for i in range(2*k+1)]
+
+
+def _offset(name, d):
+    '''Return the expression for name moved by d.'''
+    return name if d == 0 else '%s %s %d' % (name, '-+'[d > 0], abs(d))
+
+
+def _pad_source(name, k, torus, length):
+    '''Return the lines which pad the list name by k on both ends, wrapping
+    if torus.  length is the expression for its length.'''
+
+    if torus:
+        return ['if %s >= %d:' % (length, k),
+                '    %s = %s[-%d:] + %s + %s[:%d]' % (name, name, k, name,
+                                                      name, k),
+                'else:',
+                '    %s = [%s[j %% %s] for j in range(-%d, %s + %d)]' %
+                (name, name, length, k, length, k)]
+    return ['%s = pad + %s + pad' % (name, name)]
+
+
+def board_source(born_numbers, survive_numbers, k, bc):
+    '''Return the source of a step function for the 'torus' or 'dead'
+    boundary condition.  The function takes a 2d list of 0s and 1s and
+    returns the next state as a new 2d list.'''
+
+    torus = bc == 'torus'
+    rules = rules_tuple(born_numbers, survive_numbers, k)
+    size = (2*k+1)**2
+    cols = _names('c', k)
+    rows = _names('r', k)
+
+    unroll = k <= unroll_radius
+
+    lines = ['from itertools import accumulate',
+             'from operator import add, sub',
+             '',
+             'def step(board):',
+             '    height = len(board)',
+             '    width = len(board[0])']
+    if not torus:
+        lines += ['    pad = [0]*%d' % k,
+                  '    zero = [0]*width']
+
+    # sums along each row over the 2k+1 columns centred on each cell
+    lines += ['    sums = []',
+              '    for row in board:']
+    lines += ['        ' + line for line in
+              _pad_source('row', k, torus, 'width')]
+    if unroll:
+        lines += ['        sums.append([%s for %s in zip(%s)])' %
+                  (' + '.join(cols), ', '.join(cols),
+                   ', '.join(['row'] + ['row[%d:]' % i
+                                        for i in range(1, 2*k+1)]))]
+    else:
+        lines += ['        p = [0]',
+                  '        p += accumulate(row)',
+                  '        sums.append(list(map(sub, p[%d:], p[:width])))'
+                  % (2*k+1)]
+
+    # then down the columns over the 2k+1 rows centred on each cell
+    if torus:
+        lines += ['    ' + line for line in
+                  _pad_source('sums', k, torus, 'height')]
+    else:
+        lines += ['    sums = [zero]*%d + sums + [zero]*%d' % (k, k)]
+    if not unroll:
+        lines += ['    p = [[0]*width]',
+                  '    p += accumulate(sums, lambda a, b: '
+                  'list(map(add, a, b)))',
+                  '    return [[%r[t + %d*a]' % (rules, size) +
+                  ' for t, a in zip(map(sub, hi, lo), cells)]',
+                  '            for hi, lo, cells in zip(p[%d:], p, board)]'
+                  % (2*k+1)]
+        return '\n'.join(lines) + '\n'
+
+    lines += ['    return [[%r[%s + %d*a] for %s, a in zip(%s, cells)]' %
+              (rules, ' + '.join(cols), size, ', '.join(cols),
+               ', '.join(rows)),
+              '            for %s, cells in zip(%s, board)]' %
+              (', '.join(rows),
+               ', '.join(['sums'] + ['sums[%d:]' % i
+                                     for i in range(1, 2*k+1)]))]
+    return '\n'.join(lines) + '\n'
+
+
+def cells_source(born_numbers, survive_numbers, k):
+    '''Return the source of a step function for the 'infinite' boundary
+    condition.  The function takes a set of (y, x) positions of live cells
+    and returns the next state as a new set.'''
+
+    size = (2*k+1)**2
+    born = sorted(set(n for n in born_numbers if 0 <= n < size))
+    survive = sorted(set(n for n in survive_numbers if 0 <= n < size))
+    if 0 in born:
+        raise ValueError("born number 0 can not be used with the "
+                         "'infinite' boundary condition")
+
+    lines = ['def step(cells):',
+             '    n_map = {}',
+             '    get = n_map.get',
+             '    for y, x in cells:']
+    for dy in range(-k, k+1):
+        for dx in range(-k, k+1):
+            if dy == 0 and dx == 0:
+                continue
+            lines += ['        pos = (%s, %s)' % (_offset('y', dy),
+                                                _offset('x', dx)),
+                      '        n_map[pos] = get(pos, 0) + 1']
+    lines += ['    new = set(pos for pos, n in n_map.items()',
+              '              if (n in %s if pos in cells else n in %s))' %
+              (set(survive) or 'set()', set(born) or 'set()')]
+    if 0 in survive:
+        lines += ['    new.update(pos for pos in cells if pos not in n_map)']
+    lines += ['    return new']
+    return '\n'.join(lines) + '\n'
+
+
+def get_step(born_numbers, survive_numbers, k, bc):
+    '''Return the step function for a set of rules, compiling it the first
+    time it is asked for.
+
+    inputs:
+        born_numbers, survive_numbers, lists of ints the rules
+        k, int the neighborhood radius
+        bc, string the boundary condition, 'torus', 'dead' or 'infinite'
+    output:
+        step, function taking a state and returning the next state
+    '''
+
+    key = (tuple(sorted(set(born_numbers))),
+           tuple(sorted(set(survive_numbers))), k, bc)
+    step = _kernels.get(key)
+    if step is not None:
+        return step
+
+    if bc == 'infinite':
+        source = cells_source(born_numbers, survive_numbers, k)
+    elif bc in ('torus', 'dead'):
+        source = board_source(born_numbers, survive_numbers, k, bc)
+    else:
+        raise ValueError('unknown boundary condition %r' % bc)
+
+    namespace = {}
+    exec(compile(source, '<gol_kernel %s>' % (key,), 'exec'), namespace)
+    step = _kernels[key] = namespace['step']
+    return step
+
+
+def clear_cache():
+    '''Forget every compiled step function.'''
+    _kernels.clear()
@@ -0,0 +1,104 @@
+'''this file contains functions for running one start board under many
+different rules at once across a pool of processes.
+
+Each run is reduced to a small summary dict so only a few numbers are sent
+back from the worker processes.
+'''
+
+import itertools
+import multiprocessing
+
+import gol_board
+
+
+def rule_combinations(born_options, survive_options, k_radii=(1,),
+                      boundary_conditions=('torus',)):
+    '''Return every combination of the given rule settings.
+
+    inputs:
+        born_options, list of lists of born numbers
+        survive_options, list of lists of survive numbers
+        k_radii, list of neighborhood radii
+        boundary_conditions, list of boundary conditions
+    output:
+        rules, list of dicts with keys born_numbers, survive_numbers,
+               k_radius and boundary_condition, the gol_board attributes
+               they set
+    '''
+
+    return [{'born_numbers': list(born), 'survive_numbers': list(survive),
+             'k_radius': k, 'boundary_condition': bc}
+            for born, survive, k, bc in itertools.product(
+                born_options, survive_options, k_radii, boundary_conditions)]
+
+
+def summarize(board, rules, generations, engine='bitpack'):
+    '''Run board under rules and return a summary of the run.
+
+    The run stops early once gol_board finds a repeated state, since every
+    later state is then known.
+
+    inputs:
+        board, 2d list of ints the start board
+        rules, dict of gol_board attributes as made by rule_combinations
+        generations, int the most generations to run
+        engine, string the gol_board engine used.  The 'infinite' boundary
+                condition always uses the 'list' engine.
+    output:
+        summary, dict holding rules and
+                 population, int the number of live cells at generation
+                             generations
+                 generations, int the number of generations calculated
+                 stable, int the first generation of the repeating cycle,
+                         or None if no state repeated
+                 period, int the length of the cycle, or None
+    '''
+
+    gol = gol_board.gol_board(board, generations, run=False)
+    for key, value in rules.items():
+        setattr(gol, key, value)
+    infinite = gol.boundary_condition == 'infinite'
+    gol.engine = 'list' if infinite else engine
+    gol.detect_cycles = True
+
+    for t, state in enumerate(gol.iter_states()):
+        pass
+
+    calculated = t
+    if gol.period is not None:
+        # the repeated state was calculated too, and the final state is
+        # less than one period past the last one yielded
+        calculated = t + 1
+        state = gol.advance(state, (generations - t) % gol.period)
+
+    summary = dict(rules, stable=gol.cycle_start, period=gol.period)
+    summary['population'] = len(state) if infinite else sum(map(sum, state))
+    summary['generations'] = calculated
+    return summary
+
+
+def _summarize(args):
+    '''Unpack the arguments of summarize for Pool.imap_unordered.'''
+    return summarize(*args)
+
+
+def sweep(board, rules_list, generations, processes=None, engine='bitpack'):
+    '''Run board under every set of rules in rules_list in parallel.
+
+    Summaries are yielded as soon as each run finishes, so they are not in
+    the order of rules_list.
+
+    inputs:
+        board, 2d list of ints the start board
+        rules_list, list of dicts as made by rule_combinations
+        generations, int the most generations to run
+        processes, int the number of worker processes, default all cores
+        engine, string the gol_board engine used
+    output:
+        generator of summary dicts, see summarize
+    '''
+
+    jobs = [(board, rules, generations, engine) for rules in rules_list]
+    with multiprocessing.Pool(processes) as pool:
+        for summary in pool.imap_unordered(_summarize, jobs):
+            yield summary
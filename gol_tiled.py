@@ -0,0 +1,198 @@
+'''this file contains a sim which splits a large board into bands of rows,
+each advanced by its own worker process.
+
+The board is kept bit packed (see bit_board) in two shared memory buffers,
+one holding the current state and one the next.  Each generation every
+worker reads its own rows plus the k_radius rows above and below it (the halo
+written by its neighbors in the last generation) from the current buffer and
+writes its rows of the next one.  The workers then wait on a barrier so no
+halo is read before it is complete, and the buffers swap.
+'''
+
+import multiprocessing
+from multiprocessing import shared_memory
+
+import bit_board
+import gol_board
+
+
+class tiled_board:
+
+    '''Class represents a GOL sim run across several processes.
+
+    Rules are set through the same attributes as gol_board, and are read
+    each time advance is called.
+
+    attributes:
+        born_numbers, list of ints where neighbor values turn 0 to a 1
+        survive_numbers, list of ints where neighbor values maintain a 1 as a 1
+        k_radius, int neighbors are found in a square kernel with side
+                  k_radius * 2 + 1.
+        boundary_condition, 'torus' or 'dead'
+        size, list of ints [height, width] of the board
+        generation, int the number of generations advanced so far
+        processes, int the number of worker processes
+        table, 2d list of ints the rules table, see gol_board
+        error, string the error which stopped a worker, or None.  Once a
+               worker has failed the bands are out of step, so advance
+               refuses to run again.
+    '''
+
+    born_numbers = [3]
+    survive_numbers = [2, 3]
+    k_radius = 1
+    boundary_condition = 'torus'
+
+    # the rules table is made exactly as in gol_board
+    init_rules_table = gol_board.gol_board.init_rules_table
+
+    def __init__(self, start, processes=None):
+        '''create a new sim and start its worker processes.
+
+        inputs:
+            start, 2d list of ints, the starting state of the sim
+            processes, int the number of workers, default one per core
+        '''
+
+        height, width = len(start), len(start[0])
+        self.size = [height, width]
+        self.generation = 0
+        self.table = []
+        self.error = None
+        self.processes = min(processes or multiprocessing.cpu_count(), height)
+        self._row_bytes = (width + 7) // 8
+
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=2 * height * self._row_bytes)
+        for i, row in enumerate(bit_board.pack_board(start)):
+            self._write_row(0, i, row)
+
+        # each worker owns a band of rows
+        bands = [height * p // self.processes
+                 for p in range(self.processes + 1)]
+        barrier = multiprocessing.Barrier(self.processes)
+        self._done = multiprocessing.Queue()
+        self._commands = []
+        self._workers = []
+        for p in range(self.processes):
+            commands = multiprocessing.Queue()
+            worker = multiprocessing.Process(
+                target=_worker, daemon=True,
+                args=(self._shm.name, self.size, bands[p], bands[p+1],
+                      barrier, commands, self._done))
+            worker.start()
+            self._commands.append(commands)
+            self._workers.append(worker)
+
+    def advance(self, generations):
+        '''Advance the sim by generations time steps.'''
+
+        if self.boundary_condition not in ('torus', 'dead'):
+            raise ValueError("tiled_board only supports the 'torus' and "
+                             "'dead' boundary conditions")
+
+        if self.error is not None:
+            raise RuntimeError('tiled_board can not advance after a worker '
+                               'failed: %s' % self.error)
+
+        self.init_rules_table()
+        command = (self.generation % 2, generations, self.table,
+                   self.k_radius, self.boundary_condition)
+        for commands in self._commands:
+            commands.put(command)
+        errors = [self._done.get() for worker in self._workers]
+        errors = [e for e in errors if e is not None]
+        if errors:
+            # the other workers only see the barrier broken by the one which
+            # failed, so report the first real error
+            errors.sort(key=lambda e: e.startswith('BrokenBarrierError'))
+            self.error = errors[0]
+            raise RuntimeError('tiled_board worker failed: %s' % self.error)
+
+        self.generation += generations
+
+    def get_board(self):
+        '''Return the current state as a 2d list.'''
+
+        buffer = self.generation % 2
+        rows = [self._read_row(buffer, i) for i in range(self.size[0])]
+        return bit_board.unpack_board(rows, self.size[1])
+
+    def close(self):
+        '''Stop the workers and free the shared memory.'''
+
+        for commands in self._commands:
+            commands.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_row(self, buffer, i):
+        '''Return row i of buffer as an int.'''
+        start = (buffer * self.size[0] + i) * self._row_bytes
+        return int.from_bytes(self._shm.buf[start:start + self._row_bytes],
+                              'little')
+
+    def _write_row(self, buffer, i, row):
+        '''Set row i of buffer from an int.'''
+        start = (buffer * self.size[0] + i) * self._row_bytes
+        self._shm.buf[start:start + self._row_bytes] = \
+            row.to_bytes(self._row_bytes, 'little')
+
+
+def _worker(name, size, lo, hi, barrier, commands, done):
+    '''Advance rows lo to hi of the board in shared memory name each time a
+    command arrives, until None is received.
+
+    Each command is (buffer, generations, table, k_radius,
+    boundary_condition) where buffer is the one holding the current state.
+    None, or the error message if one is raised, is put in done after each
+    command.
+    '''
+
+    shm = shared_memory.SharedMemory(name=name)
+    height, width = size
+    row_bytes = (width + 7) // 8
+    buf = shm.buf
+
+    try:
+        for command in iter(commands.get, None):
+            try:
+                buffer, generations, table, k_radius, bc = command
+                for t in range(generations):
+                    # read this band and its halo from the current buffer
+                    base = buffer * height
+                    window = []
+                    for i in range(lo - k_radius, hi + k_radius):
+                        if bc != 'torus' and not 0 <= i < height:
+                            window.append(0)
+                            continue
+                        start = (base + i % height) * row_bytes
+                        window.append(int.from_bytes(
+                            buf[start:start + row_bytes], 'little'))
+
+                    rows = bit_board.step_rows(window, width, table,
+                                               k_radius, bc)
+
+                    base = (1 - buffer) * height
+                    for i, row in zip(range(lo, hi), rows):
+                        start = (base + i) * row_bytes
+                        buf[start:start + row_bytes] = \
+                            row.to_bytes(row_bytes, 'little')
+
+                    barrier.wait()
+                    buffer = 1 - buffer
+                done.put(None)
+            except Exception as e:
+                barrier.abort()
+                done.put(repr(e))
+    finally:
+        del buf
+        shm.close()
@@ -0,0 +1,108 @@
+'''this file contains optional timers which add up the wall time and number of
+calls spent in each phase of a sim, e.g. counting neighbors, looking up the
+rules table or rendering frames.
+
+Timing is off by default.  Set enabled to True to start collecting, then read
+the totals with get_stats or report.  While disabled each timed call only
+costs one extra function call and a check of enabled.
+
+    gol_timing.enabled = True
+    gol.run()
+    print(gol_timing.report())
+'''
+
+import functools
+import threading
+import time
+
+enabled = False
+
+# phase name -> [calls, seconds]
+_stats = {}
+_lock = threading.Lock()
+
+
+def add(name, seconds, calls=1):
+    '''Add seconds and calls to the totals of phase name.'''
+
+    with _lock:
+        totals = _stats.setdefault(name, [0, 0.0])
+        totals[0] += calls
+        totals[1] += seconds
+
+
+def timed(name):
+    '''Return a decorator which times every call of a function as phase name
+    while enabled is True.'''
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class phase:
+
+    '''Context manager which times the block it holds as phase name while
+    enabled is True.
+
+        with gol_timing.phase('canvas'):
+            canvas.update()
+    '''
+
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            add(self.name, time.perf_counter() - self.start)
+            self.start = None
+
+
+def get_stats():
+    '''Return a copy of the totals.
+
+    output:
+        stats, dict mapping phase name to a tuple (calls, seconds)
+    '''
+
+    with _lock:
+        return {name: tuple(totals) for name, totals in _stats.items()}
+
+
+def reset():
+    '''Forget every total collected so far.'''
+
+    with _lock:
+        _stats.clear()
+
+
+def report(sep='\n'):
+    '''Return the totals as text, slowest phase first.
+
+    input:
+        sep, string placed between the phases
+    output:
+        text, string with the calls, total ms and ms per call of each phase
+    '''
+
+    stats = sorted(get_stats().items(), key=lambda item: -item[1][1])
+    return sep.join('%s: %d calls, %.1f ms (%.3f ms/call)' %
+                    (name, calls, seconds*1000, seconds*1000/calls)
+                    for name, (calls, seconds) in stats)
@@ -0,0 +1,311 @@
+'''this file contains a hashlife simulation for boards without edges.
+
+The universe is stored as a quadtree whose nodes are canonicalized, so every
+distinct square of cells only exists once.  The result of advancing each node
+is memoized, which lets repeating patterns be advanced 2^k generations at a
+time in roughly the time it takes to advance them once.
+'''
+
+import gol_board
+
+
+class _node:
+    '''A square of 2^k x 2^k cells made of four 2^(k-1) squares.
+
+    Level 0 nodes are single cells and have no children.
+
+    attributes:
+        k, int the level of the node
+        nw, ne, sw, se, _node the four quadrants
+        pop, int the number of live cells in the node
+    '''
+
+    __slots__ = ('k', 'nw', 'ne', 'sw', 'se', 'pop')
+
+    def __init__(self, k, nw, ne, sw, se, pop):
+        self.k = k
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.pop = pop
+
+
+class hashlife:
+
+    '''Class represents a GOL sim on an infinite board using hashlife.
+
+    Only radius 1 neighborhoods are supported, and the born numbers may not
+    contain 0 since empty space would then come alive.
+
+    attributes:
+        born_numbers, list of ints where neighbor values turn 0 to a 1
+        survive_numbers, list of ints where neighbor values maintain a 1 as a 1
+        max_nodes, int the number of canonical nodes kept before the caches
+                   are cleared of everything not needed by root
+        root, _node the quadtree holding the current state
+        origin, list of ints [y, x] position of the top left cell of root
+        generation, int the number of generations advanced so far
+    '''
+
+    born_numbers = [3]
+    survive_numbers = [2, 3]
+    max_nodes = 2**20
+
+    def __init__(self, start, max_nodes=None):
+        '''create a new simulation from a starting state.
+
+        inputs:
+            start, 2d list of ints, the starting state of the sim.  Cell
+                   start[y][x] is placed at position [y, x].
+            max_nodes, int optional limit on the size of the node cache
+        '''
+
+        if max_nodes is not None:
+            self.max_nodes = max_nodes
+
+        self.generation = 0
+        self.set_cells([(y, x) for y in range(len(start))
+                        for x in range(len(start[y])) if start[y][x]])
+
+    def set_cells(self, cells):
+        '''Replace the current state with the given live cells.
+
+        input:
+            cells, iterable of (y, x) positions of live cells
+        '''
+
+        self._nodes = {}
+        self._results = {}
+        self.off = _node(0, None, None, None, None, 0)
+        self.on = _node(0, None, None, None, None, 1)
+        self._empty = [self.off]
+        self._rules = None
+
+        cells = list(cells)
+        if cells:
+            y0 = min(c[0] for c in cells)
+            x0 = min(c[1] for c in cells)
+            size = max(max(c[0] for c in cells) - y0,
+                       max(c[1] for c in cells) - x0) + 1
+        else:
+            y0, x0, size = 0, 0, 1
+
+        k = max((size - 1).bit_length(), 2)
+        self.origin = [y0, x0]
+        self.root = self.build([(y - y0, x - x0) for y, x in cells], k)
+
+    def build(self, cells, k):
+        '''Return the level k node holding cells, positions relative to its
+        top left corner.'''
+
+        if not cells:
+            return self.empty(k)
+        if k == 0:
+            return self.on
+
+        half = 1 << (k - 1)
+        quads = [[], [], [], []]
+        for y, x in cells:
+            quads[(y >= half)*2 + (x >= half)].append((y % half, x % half))
+
+        return self.join(*[self.build(q, k - 1) for q in quads])
+
+    def join(self, nw, ne, sw, se):
+        '''Return the canonical node made of four quadrants.'''
+
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            node = _node(nw.k + 1, nw, ne, sw, se,
+                         nw.pop + ne.pop + sw.pop + se.pop)
+            self._nodes[key] = node
+        return node
+
+    def empty(self, k):
+        '''Return the canonical empty node of level k.'''
+
+        while len(self._empty) <= k:
+            z = self._empty[-1]
+            self._empty.append(self.join(z, z, z, z))
+        return self._empty[k]
+
+    def centre(self, m):
+        '''Return a node of level m.k + 1 with m in its centre.'''
+
+        z = self.empty(m.k - 1)
+        return self.join(self.join(z, z, z, m.nw), self.join(z, z, m.ne, z),
+                         self.join(z, m.sw, z, z), self.join(m.se, z, z, z))
+
+    def is_padded(self, m):
+        '''Return True if every live cell of m is in its central quarter.'''
+
+        return (m.nw.se.pop + m.ne.sw.pop +
+                m.sw.ne.pop + m.se.nw.pop) == m.pop
+
+    def life_4x4(self, m):
+        '''Return the centre 2x2 of a level 2 node advanced one generation.'''
+
+        grid = [[0]*4 for i in range(4)]
+        for qy, qx, q in [(0, 0, m.nw), (0, 2, m.ne),
+                          (2, 0, m.sw), (2, 2, m.se)]:
+            grid[qy][qx] = q.nw.pop
+            grid[qy][qx+1] = q.ne.pop
+            grid[qy+1][qx] = q.sw.pop
+            grid[qy+1][qx+1] = q.se.pop
+
+        cells = []
+        for y in (1, 2):
+            for x in (1, 2):
+                n = sum(grid[y+dy][x+dx] for dy in (-1, 0, 1)
+                        for dx in (-1, 0, 1)) - grid[y][x]
+                alive = n in self._rules[grid[y][x]]
+                cells.append(self.on if alive else self.off)
+
+        return self.join(*cells)
+
+    def successor(self, m, j):
+        '''Return the centre of m advanced 2^j generations.
+
+        inputs:
+            m, _node of level k >= 2
+            j, int with j <= k - 2
+        output:
+            node, _node of level k - 1
+        '''
+
+        if m.pop == 0:
+            return m.nw
+
+        key = (m, j)
+        result = self._results.get(key)
+        if result is not None:
+            return result
+
+        if m.k == 2:
+            result = self.life_4x4(m)
+        else:
+            join = self.join
+            c1 = self.successor(join(m.nw.nw, m.nw.ne, m.nw.sw, m.nw.se), j)
+            c2 = self.successor(join(m.nw.ne, m.ne.nw, m.nw.se, m.ne.sw), j)
+            c3 = self.successor(join(m.ne.nw, m.ne.ne, m.ne.sw, m.ne.se), j)
+            c4 = self.successor(join(m.nw.sw, m.nw.se, m.sw.nw, m.sw.ne), j)
+            c5 = self.successor(join(m.nw.se, m.ne.sw, m.sw.ne, m.se.nw), j)
+            c6 = self.successor(join(m.ne.sw, m.ne.se, m.se.nw, m.se.ne), j)
+            c7 = self.successor(join(m.sw.nw, m.sw.ne, m.sw.sw, m.sw.se), j)
+            c8 = self.successor(join(m.sw.ne, m.se.nw, m.sw.se, m.se.sw), j)
+            c9 = self.successor(join(m.se.nw, m.se.ne, m.se.sw, m.se.se), j)
+
+            if j < m.k - 2:
+                # the nine sub results are already 2^j generations ahead
+                result = join(join(c1.se, c2.sw, c4.ne, c5.nw),
+                              join(c2.se, c3.sw, c5.ne, c6.nw),
+                              join(c4.se, c5.sw, c7.ne, c8.nw),
+                              join(c5.se, c6.sw, c8.ne, c9.nw))
+            else:
+                result = join(self.successor(join(c1, c2, c4, c5), j),
+                              self.successor(join(c2, c3, c5, c6), j),
+                              self.successor(join(c4, c5, c7, c8), j),
+                              self.successor(join(c5, c6, c8, c9), j))
+
+        self._results[key] = result
+        return result
+
+    def step(self, k):
+        '''Advance the simulation 2^k generations in a single jump.'''
+
+        rules = (set(self.born_numbers), set(self.survive_numbers))
+        if rules != self._rules:
+            if 0 in rules[0]:
+                raise ValueError('hashlife does not support born number 0')
+            # memoized results are only valid for the rules they used
+            self._rules = rules
+            self._results = {}
+
+        node = self.root
+        while node.k < k + 2 or not self.is_padded(node):
+            self.origin[0] -= 1 << (node.k - 1)
+            self.origin[1] -= 1 << (node.k - 1)
+            node = self.centre(node)
+
+        # the successor of the centred node covers the same area as node
+        self.root = self.successor(self.centre(node), k)
+        self.generation += 1 << k
+
+        if len(self._nodes) > self.max_nodes:
+            self.collect()
+
+    def advance(self, generations):
+        '''Advance the simulation by any number of generations using one
+        jump for each bit set in generations.'''
+
+        k = 0
+        while generations:
+            if generations & 1:
+                self.step(k)
+            generations >>= 1
+            k += 1
+
+    def collect(self):
+        '''Clear the caches of everything that is not part of root.'''
+
+        self._results = {}
+        self._nodes = {}
+        self._empty = [self.off]
+
+        seen = set()
+        stack = [self.root]
+        while stack:
+            m = stack.pop()
+            if m.k == 0 or id(m) in seen:
+                continue
+            seen.add(id(m))
+            self._nodes[(m.nw, m.ne, m.sw, m.se)] = m
+            stack.extend((m.nw, m.ne, m.sw, m.se))
+
+        # keep the empty nodes canonical with the ones inside root
+        for k in range(1, self.root.k + 1):
+            self.empty(k)
+
+    def population(self):
+        '''Return the number of live cells.'''
+        return self.root.pop
+
+    def get_cells(self):
+        '''Return a list of (y, x) positions of every live cell.'''
+
+        cells = []
+        stack = [(self.root, self.origin[0], self.origin[1])]
+        while stack:
+            m, y, x = stack.pop()
+            if m.pop == 0:
+                continue
+            if m.k == 0:
+                cells.append((y, x))
+                continue
+            half = 1 << (m.k - 1)
+            stack.extend([(m.nw, y, x), (m.ne, y, x + half),
+                          (m.sw, y + half, x), (m.se, y + half, x + half)])
+
+        return cells
+
+    def get_board(self, y0=None, x0=None, height=None, width=None):
+        '''Return a window of the current state as a 2d list.
+
+        By default the window is the bounding box of the live cells.
+
+        inputs:
+            y0, x0, ints the position of the top left cell of the window
+            height, width, ints the size of the window
+        output:
+            board, 2d list of ints (height x width)
+        '''
+
+        cells = self.get_cells()
+        if y0 is None:
+            y0 = min([c[0] for c in cells], default=0)
+            x0 = min([c[1] for c in cells], default=0)
+            height = max([c[0] for c in cells], default=y0) - y0 + 1
+            width = max([c[1] for c in cells], default=x0) - x0 + 1
+
+        return gol_board.cells2board(cells, y0, x0, height, width)
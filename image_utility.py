@@ -1,12 +1,23 @@
 '''this file contains functions for converting to and from 2d lists and
-PhotoImages.
+PhotoImages, and for loading GIF files into 2d lists without Tk.
 Author: Nathan Willy
 7/15/19
 '''
 
 import tkinter as tk
+import collections
+import itertools
 import random
 
+import board_array
+import gol_timing
+
+# grey level of each cell value, dead cells are white and live cells black
+_GREY = bytes([255] + [0]*255)
+
+# grey level of the pixels of a view which lie outside the board
+_OUTSIDE = 192
+
 
 def all_board2img(b_list):
     '''Run board2img on a list of 2d lists.  Return list of PhotoImage
@@ -23,13 +34,15 @@ def all_board2img(b_list):
     return i_list
 
 
+@gol_timing.timed('board2img')
 def board2img(board):
     '''Convert a 2d list of numericss into a PhotoImage.
 
     Elements in the list which are zeros (dead cells) are converted into white
     pixels.  Other elements are considered live cells and are converted to
     black pixels. The returned PhotoImage is of the same dimensions as board.
-    Note: this method is the current processing bottleneck.
+    The image is built from binary PGM data made by board2pgm so Tk decodes
+    the whole image in a single call.
 
     input:
         board, a complete 2d list containing numeric values
@@ -37,22 +50,116 @@ def board2img(board):
         img, PhotoImage
     '''
 
-    width = len(board[0])
-    height = len(board)
-    img = tk.PhotoImage(width=width, height=height)
+    return tk.PhotoImage(data=board2pgm(board), format='PPM')
+
+
+def board2pgm(board):
+    '''Convert a 2d list of numerics into binary PGM (P5) image data.
+
+    Dead cells are white and live cells are black, as in board2img.  Each row
+    is converted with bytes.translate, so there is no python work per cell.
+    Cell values must be in range(256).
+
+    input:
+        board, a complete 2d list containing numeric values, or a
+               board_array
+    output:
+        data, bytes the PGM file contents
+    '''
+
+    header = b'P5 %d %d 255\n' % (len(board[0]), len(board))
+    if isinstance(board, board_array.board_array):
+        pixels = board.cells.translate(_GREY)
+    else:
+        pixels = b''.join(bytes(row) for row in board).translate(_GREY)
+    return header + pixels
+
+
+@gol_timing.timed('view2img')
+def view2img(board, y0, x0, height, width, scale=1):
+    '''Draw a window of board as a PhotoImage of height x width pixels.
+
+    See view2pgm.  Only the cells inside the window are read, so large
+    boards draw as fast as small ones.
+    '''
+
+    return tk.PhotoImage(data=view2pgm(board, y0, x0, height, width, scale),
+                         format='PPM')
+
+
+def view2pgm(board, y0, x0, height, width, scale=1):
+    '''Convert the window of board with top left cell (y0, x0) into binary
+    PGM image data of height x width pixels.
+
+    With scale >= 1 each cell is drawn as a square of int(scale) pixels.  With
+    scale < 1 each pixel is a block of round(1/scale) x round(1/scale) cells
+    and is black if any cell in the block is alive.  Blocks are combined a row
+    at a time by or-ing the rows read as ints, one byte per cell, so the work
+    depends on the cells in the window and not the size of board.  Pixels
+    outside the board are grey.
+
+    inputs:
+        board, 2d list of 0s and 1s, or a board_array
+        y0, x0, ints the top left cell of the window, may be outside board
+        height, width, ints the size of the image in pixels
+        scale, number the pixels per cell
+    output:
+        data, bytes the PGM file contents
+    '''
+
+    if scale >= 1:
+        scale, block = int(scale), 1
+    else:
+        scale, block = 1, int(round(1/scale))
+    board_height, board_width = len(board), len(board[0])
+
+    # the window is split into units of block x block cells, each drawn as
+    # scale x scale pixels.  Columns of units [left, right) touch the board.
+    units = -(-width // scale)
+    left = min(max(-x0 // block, 0), units)
+    right = min(max(-(-(board_width - x0) // block), left), units)
+    start = x0 + left*block
+    stop = x0 + right*block
+    cells = slice(max(start, 0), min(stop, board_width))
+    lpad = bytes(max(-start, 0))
+    rpad = bytes(max(stop - board_width, 0))
 
-    pix = ([255]*3 if board[j][i] == 0 else [0]*3
-           for j in range(height)
-           for i in range(width))
+    outside = bytes([_OUTSIDE])
+    blank = outside*width
+    edges = (outside*(left*scale), outside*((units - right)*scale))
 
-    pixels = " ".join(("{" + " ".join(('#%02x%02x%02x' %
-        tuple(next(pix)) for i in range(width)))+"}" for j in range(height)))
+    rows = []
+    for v in range(-(-height // scale)):
+        top = y0 + v*block
+        ys = range(max(top, 0), min(top + block, board_height))
+        if not ys or right == left:
+            rows.extend([blank]*scale)
+            continue
 
-    img.put(pixels, (0, 0, width, height))
+        if block == 1:
+            line = bytes(board[ys[0]][cells])
+        else:
+            # or the rows together, then every block of columns
+            acc = 0
+            for y in ys:
+                acc |= int.from_bytes(bytes(board[y][cells]), 'little')
+            line = lpad + acc.to_bytes(cells.stop - cells.start,
+                                       'little') + rpad
+            acc = 0
+            for i in range(block):
+                acc |= int.from_bytes(line[i::block], 'little')
+            line = acc.to_bytes(right - left, 'little')
 
-    return img
+        line = line.translate(_GREY)
+        if scale > 1:
+            line = bytes(itertools.chain.from_iterable(zip(*[line]*scale)))
+        line = (edges[0] + line + edges[1])[:width]
+        rows.extend([line]*scale)
 
+    return b'P5 %d %d 255\n' % (width, height) + b''.join(rows[:height])
 
+
+@gol_timing.timed('load_board')
 def img2board(img):
     '''Convert a PhotoImage into a 2d list of 0s and 1s.
 
@@ -71,6 +178,157 @@ def img2board(img):
     return board
 
 
+def load_board(path):
+    '''Load an image file into a 2d list of 0s and 1s.
+
+    GIF files are decoded by load_gif, which does not need Tk.  Other formats
+    Tk can read are loaded with PhotoImage and img2board, which needs a Tk
+    interpreter.
+
+    input:
+        path, string locating the image file
+    output:
+        board, a 2d list representing the image
+    '''
+
+    try:
+        return load_gif(path)
+    except ValueError:
+        return img2board(tk.PhotoImage(file=path))
+
+
+@gol_timing.timed('load_board')
+def load_gif(path):
+    '''Load a GIF file straight into a 2d list of 0s and 1s without Tk.
+
+    Only the first image in the file is used.  As in img2board, pixels whose
+    palette color has a red value < 128 become 1, others 0.  Pixels which
+    the image does not cover, or which are transparent, are 0.
+
+    input:
+        path, string locating the GIF file
+    output:
+        board, a 2d list representing the image
+    '''
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if data[:6] not in (b'GIF87a', b'GIF89a'):
+        raise ValueError('%s is not a GIF file' % path)
+
+    width = int.from_bytes(data[6:8], 'little')
+    height = int.from_bytes(data[8:10], 'little')
+    palette = b''
+    pos = 13
+    if data[10] & 0x80:
+        palette = data[pos:pos + 3*(2 << (data[10] & 7))]
+        pos += len(palette)
+
+    transparent = None
+    while data[pos] != 0x2C:
+        if data[pos] != 0x21:
+            raise ValueError('%s has no image' % path)
+        # graphic control extension holds the transparent color
+        if data[pos+1] == 0xF9 and data[pos+3] & 1:
+            transparent = data[pos+6]
+        pos += 2
+        while data[pos]:
+            pos += data[pos] + 1
+        pos += 1
+
+    left = int.from_bytes(data[pos+1:pos+3], 'little')
+    top = int.from_bytes(data[pos+3:pos+5], 'little')
+    img_width = int.from_bytes(data[pos+5:pos+7], 'little')
+    img_height = int.from_bytes(data[pos+7:pos+9], 'little')
+    flags = data[pos+9]
+    pos += 10
+    if flags & 0x80:
+        palette = data[pos:pos + 3*(2 << (flags & 7))]
+        pos += 3*(2 << (flags & 7))
+
+    min_size = data[pos]
+    pos += 1
+    blocks = []
+    while data[pos]:
+        blocks.append(data[pos+1:pos+1+data[pos]])
+        pos += data[pos] + 1
+
+    pixels = _lzw_decode(b''.join(blocks), min_size)
+    pixels = pixels.ljust(img_width*img_height, b'\0')
+
+    threshold = bytearray(256)
+    for i in range(len(palette) // 3):
+        threshold[i] = 1 if palette[3*i] < 128 else 0
+    if transparent is not None:
+        threshold[transparent] = 0
+    pixels = pixels.translate(threshold)
+
+    rows = [pixels[y*img_width:(y+1)*img_width] for y in range(img_height)]
+    if flags & 0x40:
+        order = [y for start, step in ((0, 8), (4, 8), (2, 4), (1, 2))
+                 for y in range(start, img_height, step)]
+        interlaced = rows
+        rows = [None]*img_height
+        for row, y in zip(interlaced, order):
+            rows[y] = row
+
+    board = [[0]*width for i in range(height)]
+    for y, row in enumerate(rows):
+        if 0 <= top + y < height:
+            line = list(row[:max(width - left, 0)])
+            board[top + y][left:left + len(line)] = line
+
+    return board
+
+
+def _lzw_decode(data, min_size):
+    '''Decode GIF LZW compressed data into a bytearray of color indices.'''
+
+    clear = 1 << min_size
+    end = clear + 1
+    base = [bytes([i]) for i in range(clear)] + [b'', b'']
+    table = list(base)
+    size = min_size + 1
+    out = bytearray()
+    prev = None
+    buf = 0
+    nbits = 0
+
+    for byte in data:
+        buf |= byte << nbits
+        nbits += 8
+        while nbits >= size:
+            code = buf & ((1 << size) - 1)
+            buf >>= size
+            nbits -= size
+
+            if code == clear:
+                table = list(base)
+                size = min_size + 1
+                prev = None
+                continue
+            if code == end:
+                return out
+
+            if code < len(table):
+                entry = table[code]
+                if prev is not None and len(table) < 4096:
+                    table.append(prev + entry[:1])
+            elif prev is not None:
+                entry = prev + prev[:1]
+                table.append(entry)
+            else:
+                raise ValueError('corrupt GIF data')
+
+            out += entry
+            prev = entry
+            if len(table) == (1 << size) and size < 12:
+                size += 1
+
+    return out
+
+
 def create_random_board(x_pos, y_pos, prob, seed):
     '''Create and return a random 2d list.
 
@@ -90,3 +348,69 @@ def create_random_board(x_pos, y_pos, prob, seed):
               for j in range(x_pos)]
              for i in range(y_pos)]
     return board
+
+
+class frame_cache:
+    '''Class keeps the most recently used frames of a sim up to a total size
+    in bytes.
+
+    Frames are made on demand by calling render and the least recently used
+    frames are dropped once max_bytes is exceeded.  Tk stores 4 bytes per
+    pixel, which is used to estimate the size of each frame.
+
+    attributes:
+        render, function taking a frame index and returning a PhotoImage
+        max_bytes, int the most memory the cached frames may use
+        size, int the memory used by the cached frames
+        frames, OrderedDict mapping frame index to (PhotoImage, bytes)
+    '''
+
+    def __init__(self, render, max_bytes=64*2**20):
+        '''create an empty cache.
+
+        inputs:
+            render, function taking a frame index and returning a PhotoImage
+            max_bytes, int the most memory the cached frames may use
+        '''
+
+        self.render = render
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.frames = collections.OrderedDict()
+
+    def get(self, t):
+        '''Return frame t, rendering it if it is not cached.'''
+
+        if t in self.frames:
+            self.frames.move_to_end(t)
+            return self.frames[t][0]
+
+        img = self.render(t)
+        nbytes = img.width() * img.height() * 4
+        self.frames[t] = (img, nbytes)
+        self.size += nbytes
+
+        # always keep the frame just asked for
+        while self.size > self.max_bytes and len(self.frames) > 1:
+            old, (old_img, old_bytes) = self.frames.popitem(last=False)
+            self.size -= old_bytes
+
+        return img
+
+    def prefetch(self, ts):
+        '''Render the frames in ts which are not cached yet.
+
+        input:
+            ts, iterable of frame indices, e.g. the next few frames in the
+                direction of play
+        '''
+
+        for t in ts:
+            if t not in self.frames:
+                self.get(t)
+
+    def clear(self):
+        '''Drop every cached frame.'''
+
+        self.frames.clear()
+        self.size = 0
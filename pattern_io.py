@@ -0,0 +1,404 @@
+'''this file contains readers and writers for the standard Life pattern
+formats: RLE (.rle), Life 1.06 (.lif) and macrocell (.mc).
+
+Patterns are read line by line and cells are produced as they are parsed, so
+no dense board is made unless one is asked for.  RLE and Life 1.06 patterns
+are read as sets of (y, x) positions of live cells, the same form used by the
+'infinite' boundary condition.  Macrocell files describe a quadtree and are
+read straight into a hashlife sim, so patterns far too large to store cell by
+cell can still be loaded.
+
+The rules of a pattern are returned as a dict of gol_board attributes,
+e.g. {'born_numbers': [3], 'survive_numbers': [2, 3]}.
+'''
+
+import re
+
+import gol_board
+import hashlife
+
+EXTENSIONS = ('.rle', '.lif', '.life', '.mc')
+
+# an RLE run count or a single tag, and the rule in an RLE header
+_RLE_TOKEN = re.compile(r'\d+|[^\d\s]')
+_RLE_RULE = re.compile(r'rule\s*=\s*([^\s]+)')
+
+# RLE lines are kept shorter than this
+_LINE_LENGTH = 70
+
+
+def is_pattern(path):
+    '''Return True if path has the extension of a pattern file.'''
+    return path.lower().endswith(EXTENSIONS)
+
+
+def parse_rule(rule):
+    '''Convert a rule string into a dict of gol_board rules.
+
+    Both 'B3/S23' and the older survive/born form '23/3' are understood.
+    Numbers above 9 may be separated with commas, e.g. 'B3,10/S2,3'.
+
+    input:
+        rule, string
+    output:
+        rules, dict with keys born_numbers and survive_numbers
+    '''
+
+    def numbers(s):
+        s = s.strip().lstrip('BbSs')
+        if ',' in s:
+            return [int(i) for i in s.split(',') if i]
+        return [int(i) for i in s]
+
+    parts = rule.strip().split('/')
+    if len(parts) != 2:
+        raise ValueError('unknown rule %r' % rule)
+    born, survive = parts
+    if not born.strip().startswith(('B', 'b')):
+        survive, born = parts
+    try:
+        return {'born_numbers': numbers(born),
+                'survive_numbers': numbers(survive)}
+    except ValueError:
+        raise ValueError('unknown rule %r' % rule)
+
+
+def format_rule(born_numbers, survive_numbers):
+    '''Return the 'B3/S23' string for born_numbers and survive_numbers.'''
+
+    def numbers(nums):
+        sep = ',' if any(n > 9 for n in nums) else ''
+        return sep.join(str(n) for n in sorted(nums))
+
+    return 'B%s/S%s' % (numbers(born_numbers), numbers(survive_numbers))
+
+
+def iter_rle(lines, rules=None):
+    '''Yield the (y, x) positions of the live cells of an RLE pattern as
+    they are parsed.
+
+    inputs:
+        lines, iterable of strings, e.g. an open file
+        rules, dict which, if given, is filled with the rules in the header
+               as soon as it is read
+    output:
+        generator of (y, x) tuples, row by row
+    '''
+
+    y, x, count = 0, 0, None
+    header = False
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if not header and line.startswith('x'):
+            header = True
+            rule = _RLE_RULE.search(line)
+            if rules is not None and rule:
+                rules.update(parse_rule(rule.group(1)))
+            continue
+        header = True
+
+        for token in _RLE_TOKEN.findall(line):
+            if token.isdigit():
+                count = int(token)
+                continue
+
+            n = 1 if count is None else count
+            count = None
+            if token == '!':
+                return
+            elif token == '$':
+                y, x = y + n, 0
+            elif token in 'b.':
+                x += n
+            else:
+                for i in range(n):
+                    yield (y, x + i)
+                x += n
+
+
+def write_rle(f, cells, born_numbers=(3,), survive_numbers=(2, 3)):
+    '''Write live cells to f as an RLE pattern.
+
+    The pattern starts at the top left of the bounding box of cells.
+
+    inputs:
+        f, file opened for writing text
+        cells, iterable of (y, x) positions of live cells
+        born_numbers, survive_numbers, lists of ints the rules of the pattern
+    '''
+
+    cells = sorted(cells)
+    if cells:
+        y0 = cells[0][0]
+        x0 = min(x for y, x in cells)
+        height = cells[-1][0] - y0 + 1
+        width = max(x for y, x in cells) - x0 + 1
+    else:
+        y0, x0, height, width = 0, 0, 0, 0
+
+    f.write('x = %d, y = %d, rule = %s\n' %
+            (width, height, format_rule(born_numbers, survive_numbers)))
+
+    line = []
+    length = 0
+
+    def emit(n, tag):
+        nonlocal length
+        text = tag if n == 1 else '%d%s' % (n, tag)
+        if length + len(text) > _LINE_LENGTH:
+            f.write(''.join(line) + '\n')
+            line.clear()
+            length = 0
+        line.append(text)
+        length += len(text)
+
+    # cursor position and the run of live cells not yet written
+    cy, cx = 0, 0
+    run_x, run = 0, 0
+    for y, x in cells:
+        y, x = y - y0, x - x0
+        if y == cy and run and x == run_x + run:
+            run += 1
+            continue
+
+        if run:
+            emit(run, 'o')
+            cx = run_x + run
+        if y > cy:
+            emit(y - cy, '$')
+            cy, cx = y, 0
+        if x > cx:
+            emit(x - cx, 'b')
+        run_x, run = x, 1
+
+    if run:
+        emit(run, 'o')
+    emit(1, '!')
+    f.write(''.join(line) + '\n')
+
+
+def iter_life106(lines):
+    '''Yield the (y, x) positions of the live cells of a Life 1.06 pattern
+    as they are parsed.
+
+    input:
+        lines, iterable of strings, e.g. an open file
+    output:
+        generator of (y, x) tuples
+    '''
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        x, y = line.split()
+        yield (int(y), int(x))
+
+
+def write_life106(f, cells):
+    '''Write live cells to f as a Life 1.06 pattern.
+
+    inputs:
+        f, file opened for writing text
+        cells, iterable of (y, x) positions of live cells
+    '''
+
+    f.write('#Life 1.06\n')
+    for y, x in cells:
+        f.write('%d %d\n' % (x, y))
+
+
+def read_macrocell(lines, sim=None):
+    '''Read a macrocell pattern into a hashlife sim.
+
+    Each line describes one node, so the sim is built node by node and the
+    memory used grows with the size of the file and not the number of cells.
+    The root is placed with its centre at (0, 0), as Golly does.
+
+    inputs:
+        lines, iterable of strings, e.g. an open file
+        sim, hashlife to load the pattern into, a new one is made if None.
+             Its rules are set from the #R line, or to B3/S23 if there is
+             none, as the format implies.
+    output:
+        sim, hashlife holding the pattern
+    '''
+
+    if sim is None:
+        sim = hashlife.hashlife([])
+    sim.set_cells([])
+    sim.born_numbers = [3]
+    sim.survive_numbers = [2, 3]
+
+    # node 0 stands for an empty node of any level
+    nodes = [None]
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('['):
+            continue
+        if line.startswith('#'):
+            if line.startswith('#R'):
+                rules = parse_rule(line[2:])
+                sim.born_numbers = rules['born_numbers']
+                sim.survive_numbers = rules['survive_numbers']
+            continue
+
+        if line[0] in '.*$':
+            # an 8x8 leaf drawn row by row, each row ending with $
+            cells = []
+            y, x = 0, 0
+            for c in line:
+                if c == '$':
+                    y, x = y + 1, 0
+                    continue
+                if c == '*':
+                    cells.append((y, x))
+                x += 1
+            nodes.append(sim.build(cells, 3))
+            continue
+
+        k, *children = [int(i) for i in line.split()]
+        nodes.append(sim.join(*[nodes[i] if i else sim.empty(k - 1)
+                                for i in children]))
+
+    if len(nodes) > 1:
+        sim.root = nodes[-1]
+        half = 1 << (sim.root.k - 1)
+        sim.origin = [-half, -half]
+    return sim
+
+
+def write_macrocell(f, sim):
+    '''Write the current state of a hashlife sim to f as a macrocell
+    pattern.
+
+    Every distinct node is written once, so repetitive patterns stay small.
+    Positions are kept relative to each other, the root is centred on (0, 0)
+    when the file is read.
+
+    inputs:
+        f, file opened for writing text
+        sim, hashlife the sim to write
+    '''
+
+    f.write('[M2] (gol)\n')
+    f.write('#R %s\n' % format_rule(sim.born_numbers, sim.survive_numbers))
+
+    root = sim.root
+    while root.k < 3:
+        root = sim.centre(root)
+
+    numbers = {}
+
+    def leaf(m):
+        rows = [[0]*8 for i in range(8)]
+        stack = [(m, 0, 0)]
+        while stack:
+            m, y, x = stack.pop()
+            if m.pop == 0:
+                continue
+            if m.k == 0:
+                rows[y][x] = 1
+                continue
+            half = 1 << (m.k - 1)
+            stack.extend([(m.nw, y, x), (m.ne, y, x + half),
+                          (m.sw, y + half, x), (m.se, y + half, x + half)])
+        text = '$'.join(''.join('.*'[c] for c in row).rstrip('.')
+                        for row in rows) + '$'
+        return text.rstrip('$') + '$'
+
+    def write(m):
+        if m.pop == 0:
+            return 0
+        if m in numbers:
+            return numbers[m]
+        if m.k == 3:
+            f.write(leaf(m) + '\n')
+        else:
+            children = [write(c) for c in (m.nw, m.ne, m.sw, m.se)]
+            f.write('%d %d %d %d %d\n' % (m.k, *children))
+        numbers[m] = len(numbers) + 1
+        return numbers[m]
+
+    if write(root) == 0:
+        # an empty pattern still needs a root
+        f.write('4 0 0 0 0\n')
+
+
+def load_pattern(path):
+    '''Read the live cells and rules of a pattern file of any of the
+    supported formats, chosen by its extension.
+
+    input:
+        path, string the file to read
+    output:
+        cells, set of (y, x) positions of live cells
+        rules, dict of gol_board rules, empty if the file has none
+    '''
+
+    rules = {}
+    with open(path) as f:
+        name = path.lower()
+        if name.endswith('.rle'):
+            cells = set(iter_rle(f, rules))
+        elif name.endswith(('.lif', '.life')):
+            cells = set(iter_life106(f))
+        elif name.endswith('.mc'):
+            sim = read_macrocell(f)
+            cells = set(sim.get_cells())
+            rules = {'born_numbers': sim.born_numbers,
+                     'survive_numbers': sim.survive_numbers}
+        else:
+            raise ValueError('unknown pattern format %s' % path)
+    return cells, rules
+
+
+def load_board(path, margin=0):
+    '''Read a pattern file into a 2d list which can start a gol_board.
+
+    inputs:
+        path, string the file to read
+        margin, int the number of dead cells added around the pattern
+    output:
+        board, 2d list of ints the bounding box of the pattern
+        rules, dict of gol_board rules, empty if the file has none
+    '''
+
+    cells, rules = load_pattern(path)
+    if not cells:
+        return [[0]], rules
+
+    y0 = min(y for y, x in cells) - margin
+    x0 = min(x for y, x in cells) - margin
+    height = max(y for y, x in cells) - y0 + 1 + margin
+    width = max(x for y, x in cells) - x0 + 1 + margin
+    return gol_board.cells2board(cells, y0, x0, height, width), rules
+
+
+def save_pattern(path, cells, born_numbers=(3,), survive_numbers=(2, 3)):
+    '''Write live cells to a pattern file in the format chosen by the
+    extension of path.
+
+    inputs:
+        path, string the file to write
+        cells, iterable of (y, x) positions of live cells
+        born_numbers, survive_numbers, lists of ints the rules, not saved in
+                                       Life 1.06 files
+    '''
+
+    name = path.lower()
+    with open(path, 'w') as f:
+        if name.endswith('.rle'):
+            write_rle(f, cells, born_numbers, survive_numbers)
+        elif name.endswith(('.lif', '.life')):
+            write_life106(f, cells)
+        elif name.endswith('.mc'):
+            sim = hashlife.hashlife([])
+            sim.born_numbers = list(born_numbers)
+            sim.survive_numbers = list(survive_numbers)
+            sim.set_cells(cells)
+            write_macrocell(f, sim)
+        else:
+            raise ValueError('unknown pattern format %s' % path)
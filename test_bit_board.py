@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import bit_board
+import gol_board
+from test_gol_board import check_engine
+
+
+class test_bit_board(unittest.TestCase):
+    '''Runs basic unit tests on bit_board functions.'''
+
+    def setUp(self):
+        '''create test board and initialize a gol_board'''
+        self.start = [[0, 1], [0, 0], [1, 1]]
+        self.gb = gol_board.gol_board(self.start, 2)
+
+    def test_pack_board(self):
+        '''test packing and unpacking rows'''
+        rows = bit_board.pack_board(self.start)
+        self.assertEqual([2, 0, 3], rows)
+        self.assertEqual(self.start, bit_board.unpack_board(rows, 2))
+
+    def test_step_board(self):
+        '''test calculation of the next state under both bcs'''
+        rows = bit_board.pack_board(self.start)
+
+        rows2 = bit_board.step_board(rows, 2, self.gb.table, 1, 'torus')
+        self.assertEqual([[0, 1], [0, 0], [0, 1]],
+                         bit_board.unpack_board(rows2, 2))
+
+        rows2 = bit_board.step_board(rows, 2, self.gb.table, 1, 'dead')
+        self.assertEqual([[0, 0], [1, 1], [0, 0]],
+                         bit_board.unpack_board(rows2, 2))
+
+    def test_run(self):
+        '''test that states match the list engine for both bcs and radii'''
+        check_engine(self, 'bitpack')
+
+
+if __name__ == '__main__':
+    unittest.main()
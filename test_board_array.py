@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import board_array
+import gol_board
+import gol_history
+import image_utility as imgu
+from test_gol_board import check_engine
+
+
+class test_board_array(unittest.TestCase):
+    '''Runs basic unit tests on board_array functions.'''
+
+    def setUp(self):
+        '''create test board'''
+        self.start = [[0, 1], [0, 0], [1, 1]]
+        self.board = board_array.board_array.from_list(self.start)
+
+    def test_list(self):
+        '''test conversion to and from 2d lists and indexing'''
+        self.assertEqual(3, len(self.board))
+        self.assertEqual(2, len(self.board[0]))
+        self.assertEqual(self.start, self.board.tolist())
+        self.assertEqual(self.board, self.start)
+        self.assertEqual(1, self.board[-1][0])
+        self.assertEqual(bytearray(b'\x00\x01\x00\x00\x01\x01'),
+                         self.board.cells)
+
+    def test_copy(self):
+        '''test writes go to the cells of the board indexed'''
+        board = self.board.copy()
+        board[1][1] = 1
+        board[0] = [1, 1]
+        self.assertEqual([[1, 1], [0, 1], [1, 1]], board)
+        self.assertEqual(self.start, self.board)
+        self.assertNotEqual(board, self.board)
+
+    def test_rules_table(self):
+        '''test lookups keyed on 2 * total + alive'''
+        rules = board_array.rules_table([[0, 0, 0, 1, 0, 0, 0, 0, 0],
+                                         [0, 0, 1, 1, 0, 0, 0, 0, 0]])
+        self.assertEqual(1, rules[2*3 + 0])
+        self.assertEqual(1, rules[2*3 + 1])
+        self.assertEqual(1, rules[2*4 + 1])
+        self.assertEqual(0, rules[2*4 + 0])
+        self.assertEqual(0, rules[2*5 + 1])
+
+    def test_run(self):
+        '''test that states match the list engine for both bcs and radii'''
+        check_engine(self, 'array')
+
+    def test_accepted(self):
+        '''test board_arrays can be used in place of 2d lists'''
+        self.assertEqual(imgu.board2pgm(self.start),
+                         imgu.board2pgm(self.board))
+
+        history = gol_history.gol_history()
+        history.append(self.board)
+        self.assertEqual(self.start, history[0])
+
+        gb = gol_board.gol_board(self.board, 4)
+        self.assertEqual(gol_board.gol_board(self.start, 4).states,
+                         gb.states)
+
+        for wrap in [True, False]:
+            self.assertEqual(gol_board.box_sums(self.start, 1, wrap),
+                             gol_board.box_sums(self.board, 1, wrap))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+import contextlib
+import io
+import unittest
+import gol
+
+
+class test_gol(unittest.TestCase):
+    '''Runs basic unit tests on the headless command line runner.'''
+
+    def run_headless(self, argv):
+        '''run gol.run_headless quietly and return its statistics'''
+        with contextlib.redirect_stdout(io.StringIO()):
+            return gol.run_headless(gol.parse_args(argv))
+
+    def test_random_board(self):
+        '''test a random board matches a gol_board run with the same args'''
+        stats = self.run_headless(['--headless', '--width', '10',
+                                   '--height', '6', '--seed', '0',
+                                   '--generations', '5', '--engine',
+                                   'bitpack'])
+        self.assertEqual(5, stats['generations'])
+        self.assertEqual(19, stats['population'])
+
+    def test_map(self):
+        '''test running a map on an infinite board'''
+        stats = self.run_headless(['--headless', '--map', './maps/test.gif',
+                                   '--bc', 'infinite', '--generations', '1',
+                                   '--born', '3', '--survive', '2,3'])
+        self.assertEqual(2, stats['population'])
+        self.assertEqual((1, 0, 1, 1), stats['bounding box'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+import contextlib
+import io
+import unittest
+import gol_benchmark
+
+
+class test_gol_benchmark(unittest.TestCase):
+    '''Runs basic unit tests on gol_benchmark functions.'''
+
+    def test_compare(self):
+        '''test only cases slower by more than the threshold are reported'''
+        baseline = {'a': 1.0, 'b': 1.0, 'c': 1.0}
+        results = {'a': 1.2, 'b': 1.5, 'd': 9.0}
+        self.assertEqual([('b', 1.0, 1.5)],
+                         gol_benchmark.compare(results, baseline, 0.25))
+
+    def test_run_suite(self):
+        '''test a tiny suite times every kind of case'''
+        params = {'sizes': [8], 'densities': [0.5], 'radii': [1],
+                  'generations': 2}
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            results = gol_benchmark.run_suite(params, repeat=1)
+        self.assertIn('board2pgm', out.getvalue())
+        for name in ['create_random_board', 'map_neighbors_torus',
+                     'map_neighbors_dead', 'step_board', 'run', 'board2pgm']:
+            self.assertTrue(any(key.startswith(name + ' ') for key in results))
+        self.assertTrue(all(t >= 0 for t in results.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,57 @@
 # -*- coding: utf-8 -*-
 
+import os
+import tempfile
 import unittest
 import gol_board
+import gol_history
+import image_utility as imgu
+
+
+def count_neighbors(board, k, bc):
+    '''Count neighbors by visiting every cell of every kernel, the reference
+    the box sums are checked against.'''
+
+    height, width = len(board), len(board[0])
+    n_map = [[-board[i][j] for j in range(width)] for i in range(height)]
+    for i in range(height):
+        for j in range(width):
+            for di in range(-k, k+1):
+                for dj in range(-k, k+1):
+                    i2, j2 = i + di, j + dj
+                    if bc == 'torus':
+                        n_map[i][j] += board[i2 % height][j2 % width]
+                    elif 0 <= i2 < height and 0 <= j2 < width:
+                        n_map[i][j] += board[i2][j2]
+    return n_map
+
+
+def check_engine(test, engine, bcs=('torus', 'dead'),
+                 survive_numbers=(2, 3, 4, 5, 6)):
+    '''Check the states of engine match the list engine for every boundary
+    condition in bcs and radius 1, 2 and 5.
+
+    inputs:
+        test, unittest.TestCase the assertions are made with
+        engine, string the gol_board engine checked
+        bcs, sequence of strings the boundary conditions run
+        survive_numbers, sequence of ints the survive rules run
+    '''
+
+    start = imgu.create_random_board(13, 7, 0.4, 1)
+    for bc in bcs:
+        for radius in [1, 2, 5]:
+            gb1 = gol_board.gol_board(start, 0)
+            gb2 = gol_board.gol_board(start, 0)
+            for gb, name in [(gb1, 'list'), (gb2, engine)]:
+                gb.engine = name
+                gb.boundary_condition = bc
+                gb.k_radius = radius
+                gb.born_numbers = [3, 4, 5]
+                gb.survive_numbers = list(survive_numbers)
+                gb.generations = 6
+                gb.run()
+            test.assertEqual(gb1.states, gb2.states)
 
 
 class test_gol_board(unittest.TestCase):
@@ -31,6 +81,19 @@ class test_gol_board(unittest.TestCase):
         n_map2 = self.gb.map_neighbors_dead(self.start)
         self.assertEqual(n_map1, n_map2)
 
+    def test_map_neighbors_radius(self):
+        '''test the box sums against direct counting for every radius,
+        including kernels larger than the board'''
+        for seed, (width, height) in enumerate([(1, 1), (3, 2), (7, 13),
+                                                (20, 9)]):
+            board = imgu.create_random_board(width, height, 0.4, seed)
+            for bc in ['torus', 'dead']:
+                self.gb.boundary_condition = bc
+                for radius in range(1, 6):
+                    self.gb.k_radius = radius
+                    self.assertEqual(count_neighbors(board, radius, bc),
+                                     self.gb.map_neighbors(board))
+
     def test_step_board(self):
         '''test calculation of next state assuming correct (toroidal) n_map.'''
         n_map = [[5, 3], [5, 4], [4, 3]]
@@ -39,6 +102,163 @@ class test_gol_board(unittest.TestCase):
 
         self.assertEqual(board1, board2)
 
+    def test_map_neighbors_infinite(self):
+        '''test the neighbor counting on an infinite board'''
+        cells = gol_board.board2cells(self.start)
+        n_map = self.gb.map_neighbors_infinite(cells)
+        n_map1 = [[1, 0], [3, 3], [1, 1]]
+
+        self.assertEqual(17, len(n_map))
+        for i in range(3):
+            for j in range(2):
+                self.assertEqual(n_map1[i][j], n_map.get((i, j), 0))
+
+    def test_run_infinite(self):
+        '''test an infinite board against a dead board large enough that
+        the edges are never reached'''
+        start = imgu.create_random_board(8, 8, 0.5, 3)
+        big = [[0]*40 for i in range(40)]
+        for y in range(8):
+            big[y+16][16:24] = start[y]
+
+        gb1 = gol_board.gol_board(big, 10)
+        gb1.boundary_condition = 'dead'
+        gb1.run()
+
+        gb2 = gol_board.gol_board(start, 10)
+        gb2.boundary_condition = 'infinite'
+        gb2.run()
+
+        cells = set((y+16, x+16) for y, x in gb2.get_state(10))
+        self.assertEqual(gol_board.board2cells(gb1.get_state(10)), cells)
+
+        boards = gb2.dense_states()
+        self.assertEqual(len(boards[0]), len(boards[-1]))
+
+    def test_iter_states(self):
+        '''test streaming states with a bounded history'''
+        gb = gol_board.gol_board(self.start, 5, run=False)
+        gb.history_size = 2
+        states = list(gb.iter_states())
+
+        gb.run()
+        self.assertEqual(gb.states, states)
+        self.assertEqual(states[-2:], list(gb.recent))
+
+    def test_detect_cycles(self):
+        '''test a blinker stops after one period and later states are found
+        by index arithmetic'''
+        start = [[0]*5 for i in range(5)]
+        start[2][1:4] = [1, 1, 1]
+        gb = gol_board.gol_board(start, 100, run=False)
+        gb.detect_cycles = True
+        gb.run()
+
+        self.assertEqual(0, gb.cycle_start)
+        self.assertEqual(2, gb.period)
+        self.assertEqual(2, len(gb.states))
+        self.assertEqual(start, gb.get_state(100))
+        self.assertEqual(gb.states[1], gb.get_state(99))
+        self.assertEqual(gb.states[1], gb.advance(start, 99))
+
+        gb.detect_cycles = False
+        gb.run()
+        self.assertEqual(101, len(gb.states))
+
+    def test_toggle_cells(self):
+        '''test editing the start board gives the same states as a new run'''
+        start = imgu.create_random_board(12, 9, 0.4, 4)
+        original = [row[:] for row in start]
+        for bc in ['torus', 'dead']:
+            gb = gol_board.gol_board(start, 30, run=False)
+            gb.boundary_condition = bc
+            gb.run()
+            gb.toggle_cells([(0, 0), (4, 6)])
+
+            start2 = [row[:] for row in start]
+            start2[0][0] = 1 - start2[0][0]
+            start2[4][6] = 1 - start2[4][6]
+            gb2 = gol_board.gol_board(start2, 30, run=False)
+            gb2.boundary_condition = bc
+            gb2.run()
+
+            self.assertEqual(original, start)
+            for t in range(31):
+                self.assertEqual(gb2.states[t], gb.get_state(t))
+
+    def test_toggle_cells_history(self):
+        '''test editing a sim whose states are kept in a gol_history'''
+        start = imgu.create_random_board(12, 9, 0.4, 4)
+        gb = gol_board.gol_board(start, 30, run=False)
+        gb.states = gol_history.gol_history(interval=8)
+        for board in gb.iter_states():
+            gb.states.append(board)
+        gb.toggle_cells([(0, 0)])
+
+        gb2 = gol_board.gol_board(gb.start, 30, run=False)
+        gb2.run()
+
+        self.assertIsInstance(gb.states, gol_history.gol_history)
+        self.assertEqual(8, gb.states.interval)
+        for t in range(31):
+            self.assertEqual(gb2.states[t], gb.get_state(t))
+
+        # and a sim reopened from a memory mapped history file
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'run.golh')
+            gol_board.gol_board(start, 30, run=False).write_history(path)
+            gb3 = gol_board.open_history(path)
+            gb3.toggle_cells([(0, 0)])
+
+        self.assertIsInstance(gb3.states, gol_history.gol_history)
+        for t in range(31):
+            self.assertEqual(gb2.states[t], gb3.get_state(t))
+
     board = [[0, 1], [0, 0], [1, 1]]
-    if __name__ == '__main__':
-        unittest.main()
+
+
+@unittest.skipIf(gol_board.np is None, 'numpy is not installed')
+class test_gol_board_numpy(unittest.TestCase):
+    '''Runs the same checks against the numpy engine.'''
+
+    def setUp(self):
+        '''create test board and initialize a gol_board'''
+        self.start = [[0, 1], [0, 0], [1, 1]]
+        self.gb = gol_board.gol_board(self.start, 2)
+        self.gb.engine = 'numpy'
+        self.gb.run()
+
+    def test_map_neighbors_torus(self):
+        '''tests the neighbor counting under toroidal boundary condition'''
+        n_map1 = [[5, 3], [5, 4], [4, 3]]
+        n_map2 = self.gb.map_neighbors_numpy(self.start).tolist()
+        self.assertEqual(n_map1, n_map2)
+
+    def test_map_neighbors_dead(self):
+        '''test the neighbor counting under dead boundary condition'''
+        self.gb.boundary_condition = 'dead'
+        n_map1 = [[1, 0], [3, 3], [1, 1]]
+        n_map2 = self.gb.map_neighbors_numpy(self.start).tolist()
+        self.assertEqual(n_map1, n_map2)
+
+    def test_map_neighbors_radius(self):
+        '''test the box sums against direct counting for every radius,
+        including kernels larger than the board'''
+        for seed, (width, height) in enumerate([(1, 1), (3, 2), (7, 13),
+                                                (20, 9)]):
+            board = imgu.create_random_board(width, height, 0.4, seed)
+            for bc in ['torus', 'dead']:
+                self.gb.boundary_condition = bc
+                for radius in range(1, 6):
+                    self.gb.k_radius = radius
+                    n_map = self.gb.map_neighbors_numpy(board).tolist()
+                    self.assertEqual(count_neighbors(board, radius, bc),
+                                     n_map)
+
+    def test_run(self):
+        '''test that states match the list engine for both bcs and radii'''
+        check_engine(self, 'numpy')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+import gol_board
+import gol_export
+import image_utility as imgu
+
+
+class test_gol_export(unittest.TestCase):
+    '''Runs basic unit tests on gol_export functions.'''
+
+    def setUp(self):
+        '''create test board'''
+        self.board = imgu.create_random_board(21, 13, 0.4, 5)
+        self.folder = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_lzw_encode(self):
+        '''test encoded data is decoded back, including a full table'''
+        for pixels in [b'\x00', b'\x01\x00\x01\x01', bytes(5000),
+                       bytes(i*7 % 3 for i in range(20000))]:
+            data = gol_export.lzw_encode(pixels, 2)
+            self.assertEqual(pixels, bytes(imgu._lzw_decode(data, 2)))
+
+    def test_gif_writer(self):
+        '''test the first frame is read back at the right scale'''
+        path = os.path.join(self.folder.name, 'run.gif')
+        writer = gol_export.gif_writer(path, 21, 13, scale=2)
+        writer.append(self.board)
+        writer.append(self.board)
+        writer.close()
+
+        board = imgu.load_gif(path)
+        self.assertEqual(26, len(board))
+        self.assertEqual(self.board, [row[::2] for row in board[::2]])
+
+    def test_export_run(self):
+        '''test every generation gets a frame, even when states repeat'''
+        gol = gol_board.gol_board(self.board, 12, run=False)
+        pattern = os.path.join(self.folder.name, 'gen_%02d.pgm')
+        frames = gol_export.export_run(gol, gol_export.pgm_writer(pattern))
+        self.assertEqual(13, frames)
+
+        gol.run()
+        with open(pattern % 12, 'rb') as f:
+            data = f.read()
+        self.assertTrue(data.startswith(b'P5 21 13 255\n'))
+        self.assertEqual(imgu.board2pgm(gol.get_state(12)), data)
+
+    def test_run_bounds(self):
+        '''test a glider leaving the start board stays inside the bounds'''
+        glider = [[0, 1, 0, 0, 0], [0, 0, 1, 0, 0], [1, 1, 1, 0, 0],
+                  [0, 0, 0, 0, 0], [0, 0, 0, 0, 0]]
+        gol = gol_board.gol_board(glider, 20, run=False)
+        gol.boundary_condition = 'infinite'
+        bounds = gol_export.run_bounds(gol)
+        self.assertEqual((0, 0, 8, 8), bounds)
+
+        gol.run()
+        for state in gol.states:
+            board = gol_board.cells2board(state, *bounds)
+            self.assertEqual(5, sum(map(sum, board)))
+
+    def test_exporter_error(self):
+        '''test an error in the worker is raised when it is closed'''
+        path = os.path.join(self.folder.name, 'run.gif')
+        e = gol_export.exporter(gol_export.gif_writer(path, 21, 13))
+        e.put([[0]])
+        self.assertRaises(Exception, e.close)
+
+
+if __name__ == '__main__':
+    unittest.main()
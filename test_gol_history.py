@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+import gol_board
+import gol_history
+import image_utility as imgu
+
+
+class test_gol_history(unittest.TestCase):
+    '''Runs basic unit tests on gol_history functions.'''
+
+    def setUp(self):
+        '''run a small random sim'''
+        start = imgu.create_random_board(9, 7, 0.4, 2)
+        self.gb = gol_board.gol_board(start, 20)
+
+    def test_getitem(self):
+        '''test every state is rebuilt in any order'''
+        history = gol_history.gol_history(interval=6)
+        for board in self.gb.states:
+            history.append(board)
+
+        self.assertEqual(len(self.gb.states), len(history))
+        self.assertEqual(4, len(history.keyframes))
+        for t in [20, 3, 4, 5, 13, 0, 12, -1]:
+            self.assertEqual(self.gb.states[t], history[t])
+        self.assertRaises(IndexError, history.__getitem__, 21)
+
+    def test_getitem_infinite(self):
+        '''test sets of live cells are stored as differences'''
+        self.gb.boundary_condition = 'infinite'
+        self.gb.run()
+
+        history = gol_history.gol_history(interval=4)
+        for cells in self.gb.states:
+            history.append(cells)
+
+        self.assertEqual(self.gb.states, list(history))
+
+    def test_history_file(self):
+        '''test a sim written to disk is read back with its rules'''
+        self.gb.k_radius = 2
+        self.gb.born_numbers = [3, 7, 24]
+        self.gb.survive_numbers = [0, 2, 3]
+        self.gb.boundary_condition = 'dead'
+        self.gb.run()
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'run.golh')
+            self.assertEqual(21, self.gb.write_history(path))
+
+            gb = gol_board.open_history(path)
+            for key in ['born_numbers', 'survive_numbers', 'k_radius',
+                        'boundary_condition', 'generations']:
+                self.assertEqual(getattr(self.gb, key), getattr(gb, key))
+            self.assertEqual(21, len(gb.states))
+            for t in [20, 3, 0, -1]:
+                self.assertEqual(self.gb.states[t], gb.states[t])
+            gb.states.close()
+
+    def test_history_file_cycle(self):
+        '''test the cycle found while writing is saved'''
+        board = [[0]*5 for i in range(5)]
+        board[2][1:4] = [1, 1, 1]
+        gb = gol_board.gol_board(board, 100, run=False)
+        gb.detect_cycles = True
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'blinker.golh')
+            self.assertEqual(2, gb.write_history(path))
+
+            with gol_history.history_file(path) as history:
+                self.assertEqual(0, history.cycle_start)
+                self.assertEqual(2, history.period)
+                self.assertEqual(board, history[0])
+
+            # a later version is refused
+            with open(path, 'r+b') as f:
+                f.seek(4)
+                f.write((99).to_bytes(2, 'little'))
+            self.assertRaises(ValueError, gol_history.history_file, path)
+
+            with open(path, 'wb') as f:
+                f.write(b'not a history')
+            self.assertRaises(ValueError, gol_history.history_file, path)
+
+    def test_history_file_replace(self):
+        '''test writing over a file which is open leaves the open file
+        readable, and a failed write leaves the old file in place'''
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'run.golh')
+            self.gb.write_history(path)
+
+            with gol_history.history_file(path) as history:
+                gb = gol_board.gol_board(self.gb.states[5], 20)
+                gb.write_history(path)
+                self.assertEqual(self.gb.states[20], history[20])
+
+            with self.assertRaises(RuntimeError):
+                with gol_history.history_writer(path, self.gb) as writer:
+                    writer.append(self.gb.start)
+                    raise RuntimeError('stop')
+
+            with gol_history.history_file(path) as history:
+                self.assertEqual(gb.states[0], history[0])
+            self.assertEqual(['run.golh'], os.listdir(folder))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import gol_kernel
+from test_gol_board import check_engine
+
+
+class test_gol_kernel(unittest.TestCase):
+    '''Runs basic unit tests on gol_kernel functions.'''
+
+    def setUp(self):
+        '''start every test with an empty cache'''
+        gol_kernel.clear_cache()
+
+    def test_rules_tuple(self):
+        '''test lookups keyed on total + size * alive'''
+        rules = gol_kernel.rules_tuple([3], [2, 3], 1)
+        self.assertEqual(19, len(rules))
+        self.assertEqual(1, rules[3])
+        self.assertEqual(1, rules[3 + 9])
+        self.assertEqual(1, rules[4 + 9])
+        self.assertEqual(0, rules[4])
+        self.assertEqual(0, rules[5 + 9])
+
+    def test_cache(self):
+        '''test step functions are compiled once per set of rules'''
+        step = gol_kernel.get_step([3], [2, 3], 1, 'torus')
+        self.assertIs(step, gol_kernel.get_step([3], [3, 2], 1, 'torus'))
+        self.assertIsNot(step, gol_kernel.get_step([3], [2, 3], 1, 'dead'))
+        self.assertIsNot(step, gol_kernel.get_step([3], [2, 3], 2, 'torus'))
+        self.assertEqual(3, len(gol_kernel._kernels))
+
+        # a blinker
+        board = [[0, 0, 0], [1, 1, 1], [0, 0, 0]]
+        self.assertEqual([[0, 1, 0], [0, 1, 0], [0, 1, 0]],
+                         gol_kernel.get_step([3], [2, 3], 1, 'dead')(board))
+
+    def test_run(self):
+        '''test that states match the list engine for every bc and radius'''
+        check_engine(self, 'compiled', ['torus', 'dead', 'infinite'],
+                     [0, 2, 3, 4, 5, 6])
+
+    def test_infinite_born_zero(self):
+        '''test born number 0 is refused on an infinite board'''
+        with self.assertRaises(ValueError):
+            gol_kernel.get_step([0, 3], [2, 3], 1, 'infinite')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import gol_sweep
+
+
+class test_gol_sweep(unittest.TestCase):
+    '''Runs basic unit tests on gol_sweep functions.'''
+
+    def setUp(self):
+        '''create a blinker'''
+        self.board = [[0]*5 for i in range(5)]
+        self.board[2][1:4] = [1, 1, 1]
+
+    def test_rule_combinations(self):
+        '''test every combination of settings is made'''
+        rules = gol_sweep.rule_combinations([[3], [3, 6]], [[2, 3]],
+                                            [1, 2], ['torus', 'dead'])
+        self.assertEqual(8, len(rules))
+        self.assertEqual({'born_numbers': [3, 6], 'survive_numbers': [2, 3],
+                          'k_radius': 2, 'boundary_condition': 'dead'},
+                         rules[-1])
+
+    def test_summarize(self):
+        '''test a blinker is found to have period 2'''
+        rules = gol_sweep.rule_combinations([[3]], [[2, 3]])[0]
+        summary = gol_sweep.summarize(self.board, rules, 100)
+        self.assertEqual(0, summary['stable'])
+        self.assertEqual(2, summary['period'])
+        self.assertEqual(2, summary['generations'])
+        self.assertEqual(3, summary['population'])
+
+    def test_sweep(self):
+        '''test a parallel sweep gives the same summaries as summarize'''
+        rules = gol_sweep.rule_combinations([[3], [1]], [[2, 3], [5]],
+                                            [1], ['torus', 'infinite'])
+        summaries = list(gol_sweep.sweep(self.board, rules, 20, processes=2))
+        expected = [gol_sweep.summarize(self.board, r, 20) for r in rules]
+
+        key = repr
+        self.assertEqual(sorted(expected, key=key),
+                         sorted(summaries, key=key))
+
+
+if __name__ == '__main__':
+    unittest.main()
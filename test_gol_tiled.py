@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import gol_board
+import gol_tiled
+import image_utility as imgu
+
+
+class test_gol_tiled(unittest.TestCase):
+    '''Runs basic unit tests on gol_tiled functions.'''
+
+    def test_advance(self):
+        '''test states match gol_board for both bcs and radii'''
+        start = imgu.create_random_board(21, 17, 0.4, 5)
+        with gol_tiled.tiled_board(start, processes=3) as tb:
+            for bc in ['torus', 'dead']:
+                for radius in [1, 2]:
+                    gb = gol_board.gol_board(tb.get_board(), 4, run=False)
+                    gb.boundary_condition = tb.boundary_condition = bc
+                    gb.k_radius = tb.k_radius = radius
+                    gb.run()
+
+                    tb.advance(4)
+                    self.assertEqual(gb.states[-1], tb.get_board())
+
+            self.assertEqual(16, tb.generation)
+
+    def test_worker_error(self):
+        '''test a failed worker is reported by every later advance'''
+        start = imgu.create_random_board(12, 9, 0.4, 5)
+        with gol_tiled.tiled_board(start, processes=2) as tb:
+            # a rules table the workers can not index
+            tb.init_rules_table = lambda: setattr(tb, 'table', None)
+            with self.assertRaisesRegex(RuntimeError, 'TypeError'):
+                tb.advance(2)
+            del tb.init_rules_table
+            with self.assertRaisesRegex(RuntimeError, 'TypeError'):
+                tb.advance(2)
+            self.assertIn('TypeError', tb.error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import gol_board
+import gol_timing
+
+
+class test_gol_timing(unittest.TestCase):
+    '''Runs basic unit tests on gol_timing functions.'''
+
+    def setUp(self):
+        gol_timing.reset()
+
+    def tearDown(self):
+        gol_timing.enabled = False
+        gol_timing.reset()
+
+    def test_disabled(self):
+        '''test nothing is collected while timing is off'''
+        gol_timing.enabled = False
+        board = [[0, 1, 0], [0, 1, 0], [0, 1, 0]]
+        gol_board.gol_board(board, 4)
+        with gol_timing.phase('block'):
+            pass
+        self.assertEqual({}, gol_timing.get_stats())
+
+    def test_phases(self):
+        '''test each phase of a run is counted once per generation'''
+        gol_timing.enabled = True
+        board = [[0]*5 for i in range(5)]
+        board[2][1:4] = [1, 1, 1]
+        gol = gol_board.gol_board(board, 4, run=False)
+        gol.run()
+
+        stats = gol_timing.get_stats()
+        self.assertEqual(4, stats['map_neighbors'][0])
+        self.assertEqual(4, stats['rule_lookup'][0])
+        self.assertGreaterEqual(stats['map_neighbors'][1], 0)
+
+        with gol_timing.phase('block'):
+            pass
+        self.assertEqual(1, gol_timing.get_stats()['block'][0])
+        self.assertIn('map_neighbors: 4 calls', gol_timing.report())
+
+
+if __name__ == '__main__':
+    unittest.main()
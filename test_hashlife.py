@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import gol_board
+import hashlife
+import image_utility as imgu
+
+
+class test_hashlife(unittest.TestCase):
+    '''Runs basic unit tests on hashlife functions.'''
+
+    def setUp(self):
+        '''create a glider'''
+        self.glider = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+
+    def test_get_board(self):
+        '''test the start board is stored unchanged'''
+        hl = hashlife.hashlife(self.glider)
+        self.assertEqual(self.glider, hl.get_board())
+        self.assertEqual(5, hl.population())
+
+    def test_step(self):
+        '''test a glider moves one cell diagonally every 4 generations'''
+        hl = hashlife.hashlife(self.glider)
+        hl.step(10)
+        self.assertEqual(2**10, hl.generation)
+        self.assertEqual(self.glider, hl.get_board())
+        self.assertEqual(sorted((y + 256, x + 256) for y in range(3)
+                                for x in range(3) if self.glider[y][x]),
+                         sorted(hl.get_cells()))
+
+    def test_advance(self):
+        '''test against a dead boundary gol_board large enough that the
+        edges are never reached'''
+        start = imgu.create_random_board(8, 8, 0.5, 3)
+        big = [[0]*48 for i in range(48)]
+        for y in range(8):
+            big[y+20][20:28] = start[y]
+
+        gb = gol_board.gol_board(big, 13)
+        gb.boundary_condition = 'dead'
+        gb.run()
+
+        hl = hashlife.hashlife(start, max_nodes=64)
+        hl.advance(13)
+        self.assertEqual(13, hl.generation)
+        self.assertEqual(gb.states[-1], hl.get_board(-20, -20, 48, 48))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,12 +9,21 @@ class test_image_utility(unittest.TestCase):
     '''Runs basic unit tests on image_utility functions.'''
 
     def setUp(self):
-        '''Initialize a tkinter object'''
-        self.TK = tk.Tk()
+        '''Initialize a tkinter object, or None if there is no display'''
+        try:
+            self.TK = tk.Tk()
+        except tk.TclError:
+            self.TK = None
+
+    def require_tk(self):
+        '''Skip the current test if tkinter could not be initialized'''
+        if self.TK is None:
+            self.skipTest('no display available')
 
     def test_board2img(self):
         '''test conversion of 2d list to PhotoImage'''
 
+        self.require_tk()
         board = [[0, 1], [0, 0], [1, 1]]
         img = imgu.board2img(board)
 
@@ -22,9 +31,36 @@ class test_image_utility(unittest.TestCase):
             for j in range(len(board[0])):
                 self.assertEqual((1-board[i][j])*255, img.get(j, i)[0])
 
+    def test_board2pgm(self):
+        '''test conversion of 2d list to PGM data'''
+
+        board = [[0, 1], [0, 0], [1, 1]]
+        data = imgu.board2pgm(board)
+
+        self.assertEqual(b'P5 2 3 255\n\xff\x00\xff\xff\x00\x00', data)
+
+    def test_view2pgm(self):
+        '''test drawing a window of a board zoomed in and out'''
+
+        board = [[0, 1, 0, 0], [0, 0, 0, 0], [0, 0, 1, 1]]
+
+        # the whole board at 1 pixel per cell is the same as board2pgm
+        self.assertEqual(imgu.board2pgm(board),
+                         imgu.view2pgm(board, 0, 0, 3, 4))
+
+        # 2 pixels per cell, starting a cell outside the board
+        data = imgu.view2pgm(board, -1, 1, 4, 4, 2)
+        self.assertEqual(b'P5 4 4 255\n' + b'\xc0'*8 + b'\x00\x00\xff\xff'*2,
+                         data)
+
+        # 2x2 blocks of cells per pixel are black if any cell is alive
+        data = imgu.view2pgm(board, 0, 0, 2, 3, 0.5)
+        self.assertEqual(b'P5 3 2 255\n\x00\xff\xc0\xff\x00\xc0', data)
+
     def test_img2board(self):
         '''test conversion of PhotoImage to 2d list'''
 
+        self.require_tk()
         img = tk.PhotoImage(file='./maps/test.gif')
         board = [[0, 1], [0, 0], [1, 1]]
 
@@ -32,6 +68,33 @@ class test_image_utility(unittest.TestCase):
             for j in range(len(board[0])):
                 self.assertEqual((1-board[i][j])*255, img.get(j, i)[0])
 
+    def test_frame_cache(self):
+        '''test frames are rendered once and dropped when over max_bytes'''
+
+        self.require_tk()
+        rendered = []
+
+        def render(t):
+            rendered.append(t)
+            return tk.PhotoImage(width=4, height=4)
+
+        cache = imgu.frame_cache(render, max_bytes=3*4*4*4)
+        cache.get(0)
+        cache.prefetch([1, 2])
+        cache.get(0)
+        cache.get(3)
+
+        self.assertEqual([0, 1, 2, 3], rendered)
+        self.assertEqual([2, 0, 3], list(cache.frames))
+        self.assertEqual(3*4*4*4, cache.size)
+
+    def test_load_gif(self):
+        '''test decoding a GIF file straight to a 2d list'''
+
+        board = [[0, 1], [0, 0], [1, 1]]
+        self.assertEqual(board, imgu.load_gif('./maps/test.gif'))
+        self.assertEqual(board, imgu.load_board('./maps/test.gif'))
+
     def test_craete_random_board(self):
         '''test creation of random board'''
 
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import tempfile
+import unittest
+import hashlife
+import pattern_io
+
+GLIDER_GUN = '''#N Gosper glider gun
+x = 36, y = 9, rule = B3/S23
+24bo$22bobo$12b2o6b2o12b2o$11bo3bo4b2o12b2o$2o8bo5bo3b2o$2o8bo3bob2o4b
+obo$10bo5bo7bo$11bo3bo$12b2o!
+'''
+
+
+class test_pattern_io(unittest.TestCase):
+    '''Runs basic unit tests on pattern_io functions.'''
+
+    def setUp(self):
+        '''read the glider gun'''
+        self.rules = {}
+        self.cells = set(pattern_io.iter_rle(io.StringIO(GLIDER_GUN),
+                                             self.rules))
+
+    def test_parse_rule(self):
+        '''test both rule notations'''
+        rules = {'born_numbers': [3, 6], 'survive_numbers': [2, 3]}
+        self.assertEqual(rules, pattern_io.parse_rule('B36/S23'))
+        self.assertEqual(rules, pattern_io.parse_rule('23/36'))
+        self.assertEqual('B36/S23', pattern_io.format_rule([6, 3], [2, 3]))
+        self.assertRaises(ValueError, pattern_io.parse_rule, 'life')
+
+    def test_rle(self):
+        '''test an RLE pattern is read and written back'''
+        self.assertEqual(36, len(self.cells))
+        self.assertEqual({'born_numbers': [3], 'survive_numbers': [2, 3]},
+                         self.rules)
+        self.assertIn((0, 24), self.cells)
+        self.assertIn((8, 13), self.cells)
+
+        f = io.StringIO()
+        pattern_io.write_rle(f, [(y + 5, x - 3) for y, x in self.cells])
+        self.assertEqual(GLIDER_GUN.split('\n', 1)[1], f.getvalue())
+
+    def test_life106(self):
+        '''test a Life 1.06 pattern is read and written back'''
+        f = io.StringIO()
+        pattern_io.write_life106(f, self.cells)
+        self.assertTrue(f.getvalue().startswith('#Life 1.06\n'))
+        f.seek(0)
+        self.assertEqual(self.cells, set(pattern_io.iter_life106(f)))
+
+    def test_macrocell(self):
+        '''test a hashlife sim is written and read back as a macrocell'''
+        sim = hashlife.hashlife([])
+        sim.set_cells(self.cells)
+        sim.advance(300)
+
+        f = io.StringIO()
+        pattern_io.write_macrocell(f, sim)
+        f.seek(0)
+        sim2 = pattern_io.read_macrocell(f)
+
+        self.assertEqual(sim.population(), sim2.population())
+        self.assertEqual(sim.get_board(), sim2.get_board())
+        sim.advance(64)
+        sim2.advance(64)
+        self.assertEqual(sim.get_board(), sim2.get_board())
+
+        # without a #R line the rules are Life, not those of the sim given
+        sim3 = hashlife.hashlife([])
+        sim3.born_numbers = [3, 6]
+        f = io.StringIO(''.join(line for line in f.getvalue().splitlines(True)
+                                if not line.startswith('#R')))
+        pattern_io.read_macrocell(f, sim3)
+        self.assertEqual([3], sim3.born_numbers)
+        self.assertEqual([2, 3], sim3.survive_numbers)
+
+    def test_files(self):
+        '''test every format is chosen by its extension'''
+        with tempfile.TemporaryDirectory() as folder:
+            for name in ['gun.rle', 'gun.lif', 'gun.mc']:
+                path = os.path.join(folder, name)
+                pattern_io.save_pattern(path, self.cells, [3, 6], [2, 3])
+                board, rules = pattern_io.load_board(path)
+                self.assertEqual(9, len(board))
+                self.assertEqual(36, len(board[0]))
+                self.assertEqual(36, sum(map(sum, board)))
+                if not name.endswith('.lif'):
+                    self.assertEqual([3, 6], rules['born_numbers'])
+
+
+if __name__ == '__main__':
+    unittest.main()